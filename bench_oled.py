@@ -0,0 +1,64 @@
+"""
+On device benchmark of OLED frame transfer, to compare the I2C and SPI wirings.
+
+Sample usage (REPL):
+>>> import bench_oled
+>>> bench_oled.main('spi')
+"""
+import utime
+
+from rowing.hardware import OLED_I2C, OLED_SPI, oled_i2c, oled_spi
+from devices.support.i2c_bus import I2CBus
+
+REPEAT = 50
+
+
+def _time_us(f, n=REPEAT):
+    """ :return: Mean time of call (us) """
+    ts = utime.ticks_us()
+    for _ in range(n):
+        f()
+    return utime.ticks_diff(utime.ticks_us(), ts) // n
+
+
+def bench(oled, n=REPEAT):
+    """
+    Time transfers of display.
+
+    :return: Mean times (us) of full frame, single page, and single glyph (8 columns) transfers
+    """
+    w = oled.width
+    frame = [0]
+
+    def full():
+        oled.show(full=True)
+
+    def page():  # Differing page, sent through the change tracking path
+        frame[0] ^= 1
+        oled.framebuf.fill_rect(0, 0, w, 8, frame[0])
+        oled.show((0, 0, w - 1, 7))
+
+    def glyph():
+        frame[0] ^= 1
+        oled.framebuf.fill_rect(0, 0, 8, 8, frame[0])
+        oled.show((0, 0, 7, 7))
+
+    return {'full_us': _time_us(full, n), 'page_us': _time_us(page, n), 'glyph_us': _time_us(glyph, n)}
+
+
+def main(wiring=OLED_I2C, hw_i2c=True, n=REPEAT):
+    """
+    :param wiring: `OLED_I2C` or `OLED_SPI`
+    :param hw_i2c: Use hardware I2C peripheral (I2C wiring)
+    """
+    if wiring == OLED_SPI:
+        oled = oled_spi()
+    else:
+        oled = oled_i2c(I2CBus(hw=hw_i2c))
+
+    r = bench(oled, n)
+    print("OLED {}: full frame {full_us} us ({fps} fps), page {page_us} us, glyph {glyph_us} us".format(
+        wiring, fps=1000000 // r['full_us'] if r['full_us'] else 0, **r))
+    oled.fill(0)
+    oled.show(full=True)
+    return r
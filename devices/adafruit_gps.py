@@ -107,9 +107,9 @@ class GPSPoint:
             setattr(self, k, kwargs[k])
 
     @classmethod
-    def from_current(cls, gps):
+    def from_current(cls, gps, ts=None):
         return cls(
-            ts=utime.time(),
+            ts=utime.time() if ts is None else ts,
             lat=gps.latitude,
             lon=gps.longitude,
             alt=gps.altitude_m,
@@ -189,14 +189,20 @@ class GPS:
         self.speed_knots = None
         self.track_angle_deg = None
 
-    def update(self):
+    @property
+    def uart(self):
+        """UART the GPS module is attached to."""
+        return self._uart
+
+    def update(self, raw=None):
         """Check for updated data from the GPS module and process it
         accordingly.  Returns True if new data was processed, and False if
-        nothing new was received.
+        nothing new was received.  A raw sentence (bytes) already read from
+        the UART may be given, otherwise a line is read.
         """
         # Grab a sentence and check its data type to call the appropriate
         # parsing function.
-        sentence = self._parse_sentence()
+        sentence = self._parse_sentence(raw)
         if sentence is None:
             return False
         data_type, args = sentence
@@ -231,9 +237,10 @@ class GPS:
         """True if a current fix for location information is available."""
         return self.fix_quality is not None and self.fix_quality >= 1
 
-    def _parse_sentence(self):
+    def _parse_sentence(self, sentence=None):
         # Parse any NMEA sentence that is available.
-        sentence = self._uart.readline()
+        if sentence is None:
+            sentence = self._uart.readline()
         if sentence is None or sentence == b'' or len(sentence) < 1:
             return None
 
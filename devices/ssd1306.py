@@ -24,6 +24,8 @@ _SET_PRECHARGE       = const(0xd9)
 _SET_VCOM_DESEL      = const(0xdb)
 _SET_CHARGE_PUMP     = const(0x8d)
 
+_CMD_STREAM = const(32)  # Longest preallocated command stream (bytes)
+
 
 class SSD1306:
     def __init__(self, width, height, external_vcc):
@@ -34,11 +36,23 @@ class SSD1306:
         # Note the subclass must initialize self.framebuf to a framebuffer.
         # This is necessary because the underlying data buffer is different
         # between I2C and SPI implementations (I2C needs an extra byte).
+        # Subclasses also set self._data to a memoryview of the frame bytes
+        # within self.buffer, and self._data_off to its offset.
+        self._shadow = bytearray(self.pages * self.width)  # Last frame sent to display
+        self._win = bytearray((_SET_COL_ADDR, 0, 0, _SET_PAGE_ADDR, 0, 0))  # Window commands
+
+        # Double buffered transfer (see `flush_pages`):
+        self._tx = None  # Transmit buffer, laid out as self.buffer (allocated on first use)
+        self._txd = None  # Frame bytes within transmit buffer
+        self._sent = bytearray(2 * self.pages)  # Column range sent per page (first > last if none)
+        self._tx_gen = 0  # Transfer generation, incremented to supersede a transfer in progress
+        self._tx_busy = False  # Transfer in progress
+        self._resync = False  # Display contents unknown (transfer abandoned part way)
         self.poweron()
         self.init_display()
 
     def init_display(self):
-        for cmd in (
+        self.write_cmds(bytes((
                 _SET_DISP | 0x00,  # off
                 # address setting
                 _SET_MEM_ADDR, 0x00,  # horizontal
@@ -59,35 +73,163 @@ class SSD1306:
                 _SET_NORM_INV,  # not inverted
                 # charge pump
                 _SET_CHARGE_PUMP, 0x10 if self.external_vcc else 0x14,
-                _SET_DISP | 0x01): # on
-            self.write_cmd(cmd)
+                _SET_DISP | 0x01)))  # on
         self.fill(0)
-        self.show()
+        self.show(full=True)
 
     def poweroff(self):
         self.write_cmd(_SET_DISP | 0x00)
 
     def contrast(self, contrast):
-        self.write_cmd(_SET_CONTRAST)
-        self.write_cmd(contrast)
+        self.write_cmds(bytes((_SET_CONTRAST, contrast)))
 
     def invert(self, invert):
         self.write_cmd(_SET_NORM_INV | (invert & 1))
 
-    def show(self):
-        x0 = 0
-        x1 = self.width - 1
+    def _set_window(self, x0, x1, p0, p1):
         if self.width == 64:
             # displays with width of 64 pixels are shifted by 32
             x0 += 32
             x1 += 32
-        self.write_cmd(_SET_COL_ADDR)
-        self.write_cmd(x0)
-        self.write_cmd(x1)
-        self.write_cmd(_SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_framebuf()
+        win = self._win
+        win[1] = x0
+        win[2] = x1
+        win[4] = p0
+        win[5] = p1
+        self.write_cmds(win)
+
+    def show(self, rect=None, full=False):
+        """
+        Send frame to display. Only the changed column range of each page is sent, compared
+        against a shadow copy of the last sent frame.
+
+        :param rect: Area (x0, y0, x1, y1) to which changes are limited, defaults to whole frame
+        :param full: Send whole frame unconditionally
+        :return: Number of frame bytes sent
+        """
+        if full or self._resync or self._tx_busy:
+            # Supersede any transfer in progress, as its pages are not in the shadow yet:
+            self._tx_gen += 1
+            self._tx_busy = False
+            self._resync = False
+
+            self._set_window(0, self.width - 1, 0, self.pages - 1)
+            self.write_framebuf()
+            self._shadow[:] = self._data
+            return len(self._shadow)
+
+        sent = 0
+        for n in self._show_pages(rect):
+            sent += n
+        return sent
+
+    def _window(self, rect):
+        """ :return: Columns and pages (x0, x1, p0, p1) covering area """
+        if rect is None:
+            return 0, self.width - 1, 0, self.pages - 1
+        return rect[0], rect[2], rect[1] >> 3, rect[3] >> 3
+
+    def _changed(self, src, base, x0, x1):
+        """ :return: First and last index of `src` differing from shadow in range, first > last if none """
+        shadow = self._shadow
+        c0 = base + x0
+        end = base + x1
+        while c0 <= end and src[c0] == shadow[c0]:
+            c0 += 1
+        if c0 > end:
+            return c0, end
+        c1 = end
+        while src[c1] == shadow[c1]:
+            c1 -= 1
+        return c0, c1
+
+    def _show_pages(self, rect=None):
+        """ Send changed column range of each page, yielding bytes sent after each page. """
+        w = self.width
+        x0, x1, p0, p1 = self._window(rect)
+        data = self._data
+        shadow = self._shadow
+        for page in range(p0, p1 + 1):
+            base = page * w
+            c0, c1 = self._changed(data, base, x0, x1)
+            if c0 > c1:
+                continue
+
+            self._set_window(c0 - base, c1 - base, page, page)
+            self.write_data(c0, c1 + 1)
+            shadow[c0:c1 + 1] = data[c0:c1 + 1]
+            yield c1 + 1 - c0
+
+    def flush_pages(self, rect=None, lock=None):
+        """
+        Double buffered transfer of the frame, in chunks of a page, for sending between other work.
+
+        The frame is snapshot into a transmit buffer, and the changed column range of each of its
+        pages is sent, yielding bytes sent after each page. Drawing may continue between pages
+        without tearing, as only the snapshot is sent. The shadow copy takes the sent pages once
+        the whole transfer is complete; a transfer abandoned part way makes the next one send
+        the whole frame. A later `show` supersedes a transfer in progress.
+
+        :param rect: Area (x0, y0, x1, y1) to which changes are limited, defaults to whole frame
+        :param lock: Lock held while sending each page
+        """
+        w = self.width
+        full = self._resync or self._tx_busy
+        x0, x1, p0, p1 = self._window(None if full else rect)
+
+        if self._tx is None:
+            self._tx = memoryview(bytearray(len(self.buffer)))
+            self._txd = self._tx[self._data_off:]
+        tx = self._txd
+        tx[p0 * w:(p1 + 1) * w] = self._data[p0 * w:(p1 + 1) * w]
+
+        self._tx_gen += 1
+        gen = self._tx_gen
+        self._tx_busy = True
+        self._resync = False
+        sent = self._sent
+        done = False
+        try:
+            for page in range(p0, p1 + 1):
+                base = page * w
+                if full:
+                    c0, c1 = base, base + w - 1
+                else:
+                    c0, c1 = self._changed(tx, base, x0, x1)
+                sent[2 * page] = c0 - base if c0 <= c1 else w
+                sent[2 * page + 1] = c1 - base if c0 <= c1 else 0
+                if c0 > c1:
+                    continue
+
+                if lock is not None: lock.acquire()
+                try:
+                    self._set_window(c0 - base, c1 - base, page, page)
+                    self.write_data(c0, c1 + 1, self._tx)
+                finally:
+                    if lock is not None: lock.release()
+                yield c1 + 1 - c0
+
+                if self._tx_gen != gen:
+                    return  # Superseded (the whole frame was resent)
+
+            # Complete -- swap sent pages into shadow:
+            shadow = self._shadow
+            for page in range(p0, p1 + 1):
+                c0 = page * w + sent[2 * page]
+                c1 = page * w + sent[2 * page + 1]
+                if c0 <= c1:
+                    shadow[c0:c1 + 1] = tx[c0:c1 + 1]
+            done = True
+        finally:
+            if self._tx_gen == gen:
+                self._tx_busy = False
+                if not done:
+                    self._resync = True
+
+    @property
+    def data(self):
+        """Frame bytes (MONO_VLSB), without any transfer prefix."""
+        return self._data
 
     def fill(self, col):
         self.framebuf.fill(col)
@@ -107,6 +249,9 @@ class SSD1306_I2C(SSD1306):
         self.i2c = i2c
         self.addr = addr
         self.temp = bytearray(2)
+        # Command stream: control byte (Co=0, D/C#=0) followed by command bytes.
+        self._cmds = bytearray(_CMD_STREAM + 1)
+        self._cmds_mv = memoryview(self._cmds)
         # Add an extra byte to the data buffer to hold an I2C data/command byte
         # to use hardware-compatible I2C transactions.  A memoryview of the
         # buffer is used to mask this byte from the framebuffer operations
@@ -114,7 +259,10 @@ class SSD1306_I2C(SSD1306):
         # buffer).
         self.buffer = bytearray(((height // 8) * width) + 1)
         self.buffer[0] = 0x40  # Set first byte of data buffer to Co=0, D/C=1
-        self.framebuf = framebuf.FrameBuffer1(memoryview(self.buffer)[1:], width, height)
+        self._mv = memoryview(self.buffer)
+        self._data = self._mv[1:]
+        self._data_off = 1
+        self.framebuf = framebuf.FrameBuffer1(self._data, width, height)
         super().__init__(width, height, external_vcc)
 
     def write_cmd(self, cmd):
@@ -122,45 +270,83 @@ class SSD1306_I2C(SSD1306):
         self.temp[1] = cmd
         self.i2c.writeto(self.addr, self.temp)
 
+    def write_cmds(self, cmds):
+        # Send command bytes in a single I2C transaction, as a command stream.
+        n = len(cmds)
+        if n > _CMD_STREAM:
+            self.i2c.writeto(self.addr, b'\x00' + bytes(cmds))
+            return
+        self._cmds[1:n + 1] = cmds
+        self.i2c.writeto(self.addr, self._cmds_mv[:n + 1])
+
     def write_framebuf(self):
         # Blast out the frame buffer using a single I2C transaction to support
         # hardware I2C interfaces.
         self.i2c.writeto(self.addr, self.buffer)
 
+    def write_data(self, start, end, buf=None):
+        # Send frame bytes [start, end) in a single I2C transaction, by
+        # temporarily placing the data control byte just before them in
+        # the buffer (avoids copying to a separate buffer). `buf` is a
+        # memoryview laid out as self.buffer, defaulting to it.
+        mv = self._mv if buf is None else buf
+        prev = mv[start]
+        mv[start] = 0x40
+        try:
+            self.i2c.writeto(self.addr, mv[start:end + 1])
+        finally:
+            mv[start] = prev
+
     def poweron(self):
         pass
 
 
 class SSD1306_SPI(SSD1306):
-    def __init__(self, width, height, spi, dc, res, cs, external_vcc=False):
-        self.rate = 10 * 1024 * 1024
+    def __init__(self, width, height, spi, dc, res, cs, external_vcc=False, rate=10 * 1024 * 1024):
+        self.rate = rate
         dc.init(dc.OUT, value=0)
         res.init(res.OUT, value=0)
         cs.init(cs.OUT, value=1)
+        # The bus is configured once, so it must not be shared with devices
+        # needing other settings:
+        spi.init(baudrate=self.rate, polarity=0, phase=0)
         self.spi = spi
         self.dc = dc
         self.res = res
         self.cs = cs
+        self._cmd = bytearray(1)
         self.buffer = bytearray((height // 8) * width)
+        self._data = memoryview(self.buffer)
+        self._data_off = 0
         self.framebuf = framebuf.FrameBuffer1(self.buffer, width, height)
         super().__init__(width, height, external_vcc)
 
     def write_cmd(self, cmd):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+        self._cmd[0] = cmd
+        self.write_cmds(self._cmd)
+
+    def write_cmds(self, cmds):
+        # Send command bytes in a single transfer.
         self.cs.high()
         self.dc.low()
         self.cs.low()
-        self.spi.write(bytearray([cmd]))
+        self.spi.write(cmds)
         self.cs.high()
 
     def write_framebuf(self):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
         self.cs.high()
         self.dc.high()
         self.cs.low()
         self.spi.write(self.buffer)
         self.cs.high()
 
+    def write_data(self, start, end, buf=None):
+        self.cs.high()
+        self.dc.high()
+        self.cs.low()
+        self.spi.write((self._data if buf is None else buf)[start:end])
+        self.cs.high()
+
     def poweron(self):
         self.res.high()
         utime.sleep_ms(1)
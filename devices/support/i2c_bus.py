@@ -0,0 +1,145 @@
+"""
+Shared I2C bus, arbitrating device transactions between threads by priority.
+
+Each device gets an `I2CClient`, which implements the `machine.I2C` transfer methods used by the
+drivers, so a client can be handed to a driver in place of the bus. Every call is a single
+arbitrated transaction, and bus time is accounted per client.
+"""
+import _thread
+import utime
+from machine import I2C, Pin
+
+
+PRI_LOW = 0  # Bulk transfers (e.g. display flush)
+PRI_HIGH = 1  # Latency sensitive transfers (e.g. accelerometer samples)
+
+HW_FREQ = 400000  # Hz -- ESP32 I2C peripheral
+SW_FREQ = 800000  # Hz -- Bit-banged
+
+
+class I2CBus:
+    def __init__(self, sda=23, scl=22, hw=True, freq=None):
+        """
+        :param sda: SDA pin number
+        :param scl: SCL pin number
+        :param hw: Use the ESP32 hardware I2C peripheral, otherwise bit-bang
+        :param freq: Bus frequency (Hz), defaults by peripheral
+        """
+        if hw:
+            self._i2c = I2C(0, sda=Pin(sda), scl=Pin(scl), freq=freq or HW_FREQ)
+        else:
+            self._i2c = I2C(-1, sda=Pin(sda), scl=Pin(scl), freq=freq or SW_FREQ)
+
+        self._lock = _thread.allocate_lock()  # Bus ownership
+        self._state = _thread.allocate_lock()  # Guards waiting count
+        self._waiting = 0  # High priority clients waiting for the bus
+        self.clients = []
+
+    def client(self, name, priority=PRI_LOW):
+        """
+        Create device client of bus.
+
+        :param name: Name (for statistics)
+        :param priority: `PRI_LOW` or `PRI_HIGH`
+        """
+        c = I2CClient(self, name, priority)
+        self.clients.append(c)
+        return c
+
+    def acquire(self, priority=PRI_LOW):
+        """ Acquire bus. Low priority acquisitions give way while a high priority client is waiting. """
+        if priority > PRI_LOW:
+            with self._state:
+                self._waiting += 1
+            self._lock.acquire()
+            with self._state:
+                self._waiting -= 1
+            return
+
+        while True:
+            while self._waiting:
+                utime.sleep_us(50)
+            self._lock.acquire()
+            if not self._waiting:
+                return
+            self._lock.release()  # High priority client arrived -- give way
+
+    def release(self):
+        self._lock.release()
+
+    def stats(self):
+        """
+        :return: Per client statistics, by name
+        """
+        return {c.name: c.stats() for c in self.clients}
+
+    def report(self):
+        """ Print per client statistics. """
+        for c in self.clients:
+            print("I2C {}: {}".format(c.name, c.stats()))
+
+
+class I2CClient:
+    def __init__(self, bus: I2CBus, name, priority=PRI_LOW):
+        self.bus = bus
+        self.name = name
+        self.priority = priority
+
+        # Statistics:
+        self.count = 0  # Transactions
+        self.bus_us = 0  # Total time holding bus
+        self.wait_us = 0  # Total time waiting for bus
+        self.max_us = 0  # Longest transaction
+
+    def _begin(self):
+        t = utime.ticks_us()
+        self.bus.acquire(self.priority)
+        ts = utime.ticks_us()
+        self.wait_us += utime.ticks_diff(ts, t)
+        return ts
+
+    def _end(self, ts):
+        self.bus.release()
+        dt = utime.ticks_diff(utime.ticks_us(), ts)
+        self.count += 1
+        self.bus_us += dt
+        if dt > self.max_us: self.max_us = dt
+
+    def stats(self):
+        return {'n': self.count, 'bus_us': self.bus_us, 'wait_us': self.wait_us, 'max_us': self.max_us}
+
+    # `machine.I2C` interface:
+    def writeto(self, addr, buf, stop=True):
+        ts = self._begin()
+        try:
+            return self.bus._i2c.writeto(addr, buf, stop)
+        finally:
+            self._end(ts)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        ts = self._begin()
+        try:
+            return self.bus._i2c.readfrom_into(addr, buf, stop)
+        finally:
+            self._end(ts)
+
+    def readfrom_mem(self, addr, memaddr, n):
+        ts = self._begin()
+        try:
+            return self.bus._i2c.readfrom_mem(addr, memaddr, n)
+        finally:
+            self._end(ts)
+
+    def readfrom_mem_into(self, addr, memaddr, buf):
+        ts = self._begin()
+        try:
+            return self.bus._i2c.readfrom_mem_into(addr, memaddr, buf)
+        finally:
+            self._end(ts)
+
+    def writeto_mem(self, addr, memaddr, buf):
+        ts = self._begin()
+        try:
+            return self.bus._i2c.writeto_mem(addr, memaddr, buf)
+        finally:
+            self._end(ts)
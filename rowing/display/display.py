@@ -1,52 +1,279 @@
+import framebuf
+import utime
+import uasyncio as asyncio
+
 from devices.ssd1306 import SSD1306
 
 from rowing.display.elements import Element
 
 
 class DisplayHandler:
-    def __init__(self, d: SSD1306, i2c_lock=None):
+    def __init__(self, d: SSD1306, i2c_lock=None, stats=None):
+        """
+        :param stats: `RenderStats` to record render timings into (None to disable)
+        """
         self.d = d
         self.els = []  # List of `Element`s
         self.i2c_lock = i2c_lock
+        self.stats = stats
+        self.screen = None  # Active `Screen`
+
+        # Dirty area of current frame (inclusive), x0 > x1 if clean:
+        self._dx0 = self._dy0 = 0
+        self._dx1 = self._dy1 = -1
 
-    def add(self, e: Element) -> Element:
+    def add(self, e: Element, name=None) -> Element:
+        """
+        :param name: Element name (for diagnostics)
+        """
         if e in self.els: raise ValueError("Element already member.")
 
+        if name is not None: e.name = name
         self.els.append(e)
-        e.draw(self)
+        self._mark_rect(e.draw(self))
         return e
 
     @property
     def framebuf(self):
         return self.d.framebuf
 
+    # Change tracking:
+    @property
+    def dirty_rect(self):
+        """
+        :return: Area changed since last update (x0, y0, x1, y1), None if unchanged
+        """
+        if self._dx0 > self._dx1:
+            return None
+        return self._dx0, self._dy0, self._dx1, self._dy1
+
+    def mark_dirty(self, x0, y0, x1, y1):
+        """ Add area (inclusive) to the current frame's dirty area. """
+        if x0 < 0: x0 = 0
+        if y0 < 0: y0 = 0
+        if x1 >= self.d.width: x1 = self.d.width - 1
+        if y1 >= self.d.height: y1 = self.d.height - 1
+        if x0 > x1 or y0 > y1: return
+
+        if self._dx0 > self._dx1:  # Clean
+            self._dx0, self._dy0, self._dx1, self._dy1 = x0, y0, x1, y1
+            return
+        if x0 < self._dx0: self._dx0 = x0
+        if y0 < self._dy0: self._dy0 = y0
+        if x1 > self._dx1: self._dx1 = x1
+        if y1 > self._dy1: self._dy1 = y1
+
+    def mark_all_dirty(self):
+        self.mark_dirty(0, 0, self.d.width - 1, self.d.height - 1)
+
+    def _mark_rect(self, rect):
+        if rect is not None:
+            self.mark_dirty(rect[0], rect[1], rect[2], rect[3])
+
+    def _clear_dirty(self):
+        self._dx0 = self._dy0 = 0
+        self._dx1 = self._dy1 = -1
+
     # Essential interface:
     def draw_fill(self, col):
         self.d.fill(col)
+        self.mark_all_dirty()
 
     def draw_pixel(self, x, y, col):
         self.d.pixel(x, y, col)
+        self.mark_dirty(x, y, x, y)
 
     def draw_text(self, string, x, y, col=1):
         self.d.text(string, x, y, col)
+        self.mark_dirty(x, y, x + 8 * len(string) - 1, y + 7)
 
     def draw_scroll(self, dx, dy):
         self.d.scroll(dx, dy)
+        self.mark_all_dirty()
+
+    # Primitives (native `framebuf` operations):
+    def fill_rect(self, x, y, w, h, col):
+        self.d.framebuf.fill_rect(x, y, w, h, col)
+        self.mark_dirty(x, y, x + w - 1, y + h - 1)
+
+    def hline(self, x, y, w, col):
+        self.d.framebuf.hline(x, y, w, col)
+        self.mark_dirty(x, y, x + w - 1, y)
+
+    def vline(self, x, y, h, col):
+        self.d.framebuf.vline(x, y, h, col)
+        self.mark_dirty(x, y, x, y + h - 1)
+
+    def rect(self, x, y, w, h, col):
+        self.d.framebuf.rect(x, y, w, h, col)
+        self.mark_dirty(x, y, x + w - 1, y + h - 1)
+
+    def invert_rect(self, x, y, w, h):
+        """ Invert area, operating on whole frame bytes (8 rows) at a time. """
+        dw = self.d.width
+        x0 = max(x, 0)
+        x1 = min(x + w, dw)
+        y0 = max(y, 0)
+        y1 = min(y + h, self.d.height)
+        if x0 >= x1 or y0 >= y1: return
+
+        data = self.d.data
+        for page in range(y0 >> 3, ((y1 - 1) >> 3) + 1):
+            # Bits of page within [y0, y1):
+            top = y0 - (page << 3)
+            bot = y1 - (page << 3)
+            mask = (0xFF << (top if top > 0 else 0)) & (0xFF >> (8 - bot if bot < 8 else 0))
+            base = page * dw
+            for i in range(base + x0, base + x1):
+                data[i] ^= mask
+        self.mark_dirty(x0, y0, x1 - 1, y1 - 1)
+
+    def blit(self, fb, x, y, w, h, key=-1, clip=None):
+        """
+        Blit frame buffer onto display.
+
+        :param fb: Source `framebuf.FrameBuffer`
+        :param w: Source width
+        :param h: Source height
+        :param key: Transparent colour, -1 for none
+        :param clip: Area (x0, y0, x1, y1) to draw within. Rows are rounded out to whole pages.
+        """
+        if clip is None:
+            self.d.framebuf.blit(fb, x, y, key)
+            self.mark_dirty(x, y, x + w - 1, y + h - 1)
+            return
+
+        # Draw through a view of the clipped area, sharing display memory:
+        dw = self.d.width
+        cx0, cx1 = max(clip[0], 0), min(clip[2], dw - 1)
+        p0, p1 = max(clip[1], 0) >> 3, min(clip[3], self.d.height - 1) >> 3
+        if cx0 > cx1 or p0 > p1: return
+        view = framebuf.FrameBuffer(self.d.data[p0 * dw + cx0:], cx1 - cx0 + 1, (p1 - p0 + 1) * 8,
+                                    framebuf.MONO_VLSB, dw)
+        view.blit(fb, x - cx0, y - (p0 << 3), key)
+        self.mark_dirty(max(x, cx0), max(y, p0 << 3), min(x + w - 1, cx1), min(y + h - 1, (p1 << 3) + 7))
+
+    def put_pages(self, buf, x, y, w, h, tail=None):
+        """
+        Copy `MONO_VLSB` bytes (rows of bytes by page) onto display at a page aligned row, a page
+        at a time. Area must lie within the display.
+
+        :param buf: Source bytes, `w` per page
+        :param y: Top row, a multiple of 8
+        :param h: Source height
+        :param tail: `FrameBuffer` of the last page, if partly filled -- blitted, keeping the
+            rows below
+        """
+        dw = self.d.width
+        data = self.d.data
+        dst = (y >> 3) * dw + x
+        full = h >> 3
+        for p in range(full):
+            data[dst:dst + w] = buf[p * w:(p + 1) * w]
+            dst += dw
+        if tail is not None:
+            self.d.framebuf.blit(tail, x, y + (full << 3))
+        self.mark_dirty(x, y, x + w - 1, y + h - 1)
+
+    # Screens:
+    def show_screen(self, s):  # Screen
+        """
+        Make screen active: its background is copied into the frame, and only its elements are
+        drawn from then on.
+        """
+        data = self.d.data
+        if s.bg is None:  # Render background once
+            self.d.framebuf.fill(0)
+            s.draw_chrome(self)
+            s.bg = bytearray(data)
+        else:
+            data[:] = s.bg
+
+        self.screen = s
+        self.els = s.els
+        for e in self.els:
+            e.mark_dirty()
+        self.mark_all_dirty()
 
     # Extension:
     def draw_fill_box(self, ul, lr, col):
-        for x in range(ul[0], lr[0]+1):
-            for y in range(ul[1], lr[1]+1):
-                self.draw_pixel(x, y, col)
+        self.fill_rect(ul[0], ul[1], lr[0] - ul[0] + 1, lr[1] - ul[1] + 1, col)
 
-    def update(self, update_els=True):
-        """ Show updates on screen. """
+    def _render(self, update_els):
+        """
+        Redraw changed elements.
+
+        :return: Area changed since last update, None if unchanged
+        """
         if update_els:
+            stats = self.stats
             for e in self.els:
-                e.draw(self)
+                if e.dirty:
+                    if stats is None:
+                        self._mark_rect(e.draw(self))
+                        continue
+                    t = utime.ticks_us()
+                    rect = e.draw(self)
+                    stats.element(e).add(utime.ticks_diff(utime.ticks_us(), t))
+                    self._mark_rect(rect)
 
-        if self.i2c_lock is not None:  # Use coms lock if given
-            with self.i2c_lock:
-                self.d.show()
+        rect = self.dirty_rect
+        self._clear_dirty()
+        return rect
+
+    def update(self, update_els=True):
+        """
+        Show updates on screen. Only changed elements are redrawn, and nothing is sent if
+        nothing changed.
+
+        :return: If the display was updated
+        """
+        rect = self._render(update_els)
+        if rect is None:
+            return False  # Nothing changed
+
+        stats = self.stats
+        lock = self.i2c_lock if stats is None else stats.lock(self.i2c_lock)
+        if stats is not None:
+            stats.begin()
+        t = utime.ticks_us()
+        if lock is not None:  # Use coms lock if given
+            with lock:
+                sent = self.d.show(rect)
         else:
-            self.d.show()
+            sent = self.d.show(rect)
+        if stats is not None:
+            stats.flush(sent, utime.ticks_diff(utime.ticks_us(), t))
+        return True
+
+    async def update_async(self, update_els=True):
+        """
+        As `update`, but the frame is sent a page at a time, yielding to other tasks (and
+        releasing the coms lock) between pages. Elements may be drawn for the next frame while
+        this one is sent.
+
+        :return: If the display was updated
+        """
+        rect = self._render(update_els)
+        if rect is None:
+            return False  # Nothing changed
+
+        stats = self.stats
+        if stats is None:
+            for _ in self.d.flush_pages(rect, self.i2c_lock):
+                await asyncio.sleep(0)
+            return True
+
+        # Time transfer, excluding time yielded to other tasks:
+        sent = us = 0
+        lock = stats.lock(self.i2c_lock)
+        stats.begin()
+        t = utime.ticks_us()
+        for n in self.d.flush_pages(rect, lock):
+            us += utime.ticks_diff(utime.ticks_us(), t)
+            sent += n
+            await asyncio.sleep(0)
+            t = utime.ticks_us()
+        us += utime.ticks_diff(utime.ticks_us(), t)
+        stats.flush(sent, us)
+        return True
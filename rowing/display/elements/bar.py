@@ -26,7 +26,9 @@ class Bar(Element):
     def level(self, l):
         if not 0 <= l <= 1:
             raise ValueError("Level needs to be [0,1]")
-        self._l = l
+        if l != self._l:
+            self._l = l
+            self._dirty = True
 
     def _draw(self):
         """ Draw element """
@@ -47,5 +49,7 @@ class Bar(Element):
                 x = self.bx1 + fill'''
 
         if not self._d == self.VERT_B: raise ValueError("Direction not supported.")
-        self.display.draw_fill_box((self.bx1, self.by1), (self.bx2, self.by2-fill), col=0)
-        self.display.draw_fill_box((self.bx1, self.by2 - fill), (self.bx2, self.by2), col=1)
+        w = self.bx2 - self.bx1 + 1
+        self.display.fill_rect(self.bx1, self.by1, w, self.by2 - fill - self.by1, 0)
+        self.display.fill_rect(self.bx1, self.by2 - fill, w, fill + 1, 1)
+        return self.bx1, self.by1, self.bx2, self.by2
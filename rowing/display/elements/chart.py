@@ -0,0 +1,84 @@
+import array
+import framebuf
+
+from . import Element
+
+
+class Chart(Element):
+    """
+    Scrolling strip chart of a value's recent history, one column per sample.
+
+    The chart is kept in its own frame buffer: each new sample scrolls it by a column and draws
+    only the newest column, so the drawing cost per sample does not depend on the chart's width.
+    Samples are kept in a ring buffer of one chart width.
+    """
+
+    def __init__(self, ul, lr, lo, hi):
+        """
+        :param ul: Upper left corner (x, y)
+        :param lr: Lower right corner (x, y)
+        :param lo: Value at bottom of chart
+        :param hi: Value at top of chart
+        """
+        super().__init__()
+        if hi <= lo: raise ValueError("Chart range is empty.")
+        self.x, self.y = ul
+        self.w = lr[0] - ul[0] + 1
+        self.h = lr[1] - ul[1] + 1
+        self.lo = lo
+        self.hi = hi
+
+        self._buf = bytearray(self.w * ((self.h + 7) // 8))
+        self._fb = framebuf.FrameBuffer(self._buf, self.w, self.h, framebuf.MONO_VLSB)
+
+        # History ring buffer (NaN where no value):
+        self._hist = array.array('f', [float('nan')] * self.w)
+        self._i = 0  # Next sample position
+        self._pending = 0  # Samples added since drawn
+        self._last_y = None  # Row of last drawn sample
+
+    def add(self, v):
+        """ Add sample (None for a gap). """
+        self._hist[self._i] = float('nan') if v is None else v
+        self._i = (self._i + 1) % self.w
+        if self._pending < self.w:
+            self._pending += 1
+        self._dirty = True
+
+    def set(self, v):
+        self.add(v)
+
+    @property
+    def values(self):
+        """
+        :return: History, oldest first (NaN where no value)
+        """
+        return [self._hist[(self._i + j) % self.w] for j in range(self.w)]
+
+    def _row(self, v):
+        r = int((v - self.lo) * (self.h - 1) / (self.hi - self.lo) + 0.5)
+        if r < 0: r = 0
+        if r >= self.h: r = self.h - 1
+        return self.h - 1 - r
+
+    def _draw(self):
+        n = self._pending
+        if n:
+            fb = self._fb
+            w = self.w
+            fb.scroll(-n, 0)
+            fb.fill_rect(w - n, 0, n, self.h, 0)
+            for j in range(n):  # Newest columns, oldest first
+                v = self._hist[(self._i - n + j) % w]
+                if v != v:  # NaN -- gap
+                    self._last_y = None
+                    continue
+                y = self._row(v)
+                prev = self._last_y if self._last_y is not None else y
+                # Join to last sample:
+                fb.vline(w - n + j, min(y, prev), abs(y - prev) + 1, 1)
+                self._last_y = y
+            self._pending = 0
+
+        self.display.blit(self._fb, self.x, self.y, self.w, self.h)
+        return self.x, self.y, self.x + self.w - 1, self.y + self.h - 1
@@ -1,22 +1,42 @@
 class Element:
     def __init__(self):
         self.display = None  # DisplayHandler
+        self.name = None  # For diagnostics
         self._en = True
+        self._dirty = True  # Needs redrawing?
 
     # En-/disable:
-    def enable(self): self._en = True
+    def enable(self):
+        self._en = True
+        self._dirty = True
 
     def disable(self): self._en = False
 
+    # Change tracking:
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def mark_dirty(self): self._dirty = True
+
     # Update:
-    def draw(self, display):  # DisplayHandler
-        if self._en:
+    def draw(self, display, force=False):  # DisplayHandler
+        """
+        Draw element, if changed since last drawn (or forced).
+
+        :return: Drawn area (x0, y0, x1, y1), None if nothing drawn
+        """
+        if self._en and (self._dirty or force):
             self.display = display
             try:
-                self._draw()
+                rect = self._draw()
             finally:
                 self.display = None
+            self._dirty = False
+            return rect
+        return None
 
     # For subclasses
     def _draw(self):
+        """ Draw element, returning the drawn area (x0, y0, x1, y1) or None. """
         raise NotImplementedError
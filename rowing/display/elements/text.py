@@ -28,20 +28,20 @@
 # Multiple Writer instances may be created, each rendering a font to the
 # same Display object.
 
-import framebuf
-
 from . import Element
+from ..glyphs import cache, font_map
 
 
 class TextBox(Element):
-    def __init__(self, x_ul, y_ul, font):
+    def __init__(self, x_ul, y_ul, font, diff=False):
+        """
+        :param font: Font, None to set later (see `set_font`)
+        :param diff: Only redraw characters which changed (or moved) since last drawn
+        """
         super().__init__()
         self.font = font
-        # Allow to work with any font mapping
-        if font.hmap():
-            self.map = framebuf.MONO_HMSB if font.reverse() else framebuf.MONO_HLSB
-        else:
-            raise ValueError('Font must be horizontally mapped.')
+        # Allow to work with any font mapping (vertically mapped fonts are fastest)
+        self.map = font_map(font) if font is not None else None
 
         # Area color / text color:
         self.a_col = 0
@@ -55,6 +55,11 @@ class TextBox(Element):
         # Last drawn dimensions:
         self._last_dim = (0,0)
 
+        # Diff rendering -- last drawn text and character x offsets (and end offset):
+        self.diff = diff
+        self._drawn = ""
+        self._offs = [0]
+
     @property
     def text(self):
         return self._text
@@ -63,9 +68,31 @@ class TextBox(Element):
     def text(self, value):
         if not isinstance(value, str):
             value = str(value)
-        self._text = value
+        if value != self._text:
+            self._text = value
+            self._dirty = True
+
+    def set_font(self, font):
+        """ Change font (None to release it, while not drawn). """
+        if font is self.font:
+            return
+        self.font = font
+        self.map = font_map(font) if font is not None else None
+        self.mark_dirty()
+
+    def set(self, value):
+        """ Set text, unless None. """
+        if value is not None:
+            self.text = value
+
+    def mark_dirty(self):
+        super().mark_dirty()
+        self._drawn = ""  # Background may have changed -- redraw every character
 
     def _draw(self):
+        if self.diff:
+            return self._draw_diff()
+
         width = 0  # Text width
         height = 0  # Text height (Max char height)
 
@@ -74,24 +101,73 @@ class TextBox(Element):
             width += cw  # Add width to total
             if ch > height: height = ch  # Set height if larger than last
 
-        if self._last_dim[0] > width:
-            self.display.draw_fill_box((self._ul[0]+width, self._ul[1]),
-                                       (self._ul[0] + self._last_dim[0] - 1, self._ul[1] + self._last_dim[1] - 1),
-                                       col=0)
+        if self._last_dim[0] > width:  # Clear trailing area of last text
+            self.display.fill_rect(self._ul[0] + width, self._ul[1],
+                                   self._last_dim[0] - width, self._last_dim[1], self.a_col)
+
+        # Drawn area covers both new and last text:
+        w = max(width, self._last_dim[0])
+        h = max(height, self._last_dim[1])
         self._last_dim = (width, height)
+        if w == 0 or h == 0:
+            return None
+        return self._ul[0], self._ul[1], self._ul[0] + w - 1, self._ul[1] + h - 1
+
+    def _draw_diff(self):
+        text = self._text
+        prev = self._drawn
+        offs = self._offs
+        n_prev = len(prev)
+        height = self.font.height()
+
+        width = 0  # Text width
+        x0 = x1 = -1  # Redrawn column range (relative)
+        for i in range(len(text)):
+            char = text[i]
+            # offs[i + 1] still holds the last drawn offset of the next cell:
+            if i < n_prev and prev[i] == char and offs[i] == width:
+                width = offs[i + 1]  # Unchanged cell
+                continue
+            if i < len(offs):
+                offs[i] = width
+            else:
+                offs.append(width)
+            cw, _ = self._printchar(char, dx=width)
+            if x0 < 0: x0 = width
+            width += cw
+            x1 = width - 1
+
+        if self._last_dim[0] > width:  # Clear trailing area of last text
+            self.display.fill_rect(self._ul[0] + width, self._ul[1],
+                                   self._last_dim[0] - width, self._last_dim[1], self.a_col)
+            if x0 < 0: x0 = width
+            x1 = self._last_dim[0] - 1
+
+        n = len(text)
+        if n < len(offs):
+            offs[n] = width
+            del offs[n + 1:]
+        else:
+            offs.append(width)
+        self._drawn = text
+        self._last_dim = (width, height)
+
+        if x0 < 0:
+            return None
+        return self._ul[0] + x0, self._ul[1], self._ul[0] + x1, self._ul[1] + height - 1
 
     # Method using blitting. Efficient rendering for monochrome displays.
     # Tested on SSD1306. Invert is for black-on-white rendering.
     def _printchar(self, char, invert=False, dx=0):
-        glyph, char_height, char_width = self.font.get_ch(char)
+        fbc, char_width, char_height, pages = cache.get(self.font, char, invert)
 
-        buf = bytearray(glyph)
-        if invert:
-            for i, v in enumerate(buf):
-                buf[i] = 0xFF & ~ v
-        fbc = framebuf.FrameBuffer(buf, char_width, char_height, self.map)
-
-        self.display.framebuf.blit(fbc, self._ul[0]+dx, self._ul[1])
+        x, y = self._ul[0] + dx, self._ul[1]
+        if pages is not None and not y & 7 and x >= 0 and x + char_width <= self.display.d.width \
+                and y + char_height <= self.display.d.height:
+            # Vertically mapped glyph on page boundary -- copy its bytes straight into the frame:
+            self.display.put_pages(pages[0], x, y, char_width, char_height, pages[1])
+        else:
+            self.display.blit(fbc, x, y, char_width, char_height)
         return char_width, char_height
 
     def _printchar_bitwise(self, char, dx=0):
@@ -0,0 +1,114 @@
+"""
+Reader of binary (random access) font files, as written by `font_to_py.py --binary`.
+
+File format: a 4 byte header (magic byte 0x3f + mapping signature, 0xe7, glyph width, height),
+then for each character from 32 to 126 inclusive, its advance width (1 byte) followed by its
+glyph, all glyphs being of the same (maximum) width.
+"""
+from micropython import const
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ucollections import OrderedDict
+
+
+MIN_CH = const(32)
+MAX_CH = const(126)
+ERR_CH = const(63)  # '?'
+
+_MAGIC = const(0xe7)
+_SIG_BASE = const(0x3f)
+_HEADER = const(4)
+
+CACHE_SIZE = const(16)  # Glyphs kept in memory
+
+
+class BinFont:
+    """
+    Binary font, read from file as glyphs are needed. Has the interface of a `font_to_py`
+    module, so may be used in place of one (e.g. by `TextBox`).
+
+    The file is kept open, and recently used glyphs are kept in a bounded pool of buffers, which
+    are reused once full: a glyph returned by `get_ch` is only valid until the next call.
+    """
+
+    def __init__(self, path, cache=CACHE_SIZE):
+        """
+        :param path: Font file path
+        :param cache: Glyphs kept in memory
+        """
+        self.path = path
+        self._f = open(path, 'rb')
+        hdr = self._f.read(_HEADER)
+        if len(hdr) != _HEADER or hdr[1] != _MAGIC or not 0 <= hdr[0] - _SIG_BASE <= 3:
+            self._f.close()
+            raise ValueError("Not a binary font: {}".format(path))
+        sig = hdr[0] - _SIG_BASE
+        self._hmap = bool(sig & 1)
+        self._reverse = bool(sig & 2)
+        self._width = hdr[2]
+        self._height = hdr[3]
+        if self._hmap:
+            self._size = ((self._width + 7) // 8) * self._height
+        else:
+            self._size = ((self._height + 7) // 8) * self._width
+
+        self._cache_size = cache
+        self._cache = OrderedDict()  # Character code -> glyph buffer
+        self.reads = 0  # Glyphs read from file
+
+    # `font_to_py` interface:
+    def height(self):
+        return self._height
+
+    def max_width(self):
+        return self._width
+
+    def hmap(self):
+        return self._hmap
+
+    def reverse(self):
+        return self._reverse
+
+    def monospaced(self):
+        return True
+
+    def min_ch(self):
+        return MIN_CH
+
+    def max_ch(self):
+        return MAX_CH
+
+    def get_ch(self, ch):
+        """
+        :return: (glyph, height, width) of character
+        """
+        o = ord(ch)
+        if not MIN_CH <= o <= MAX_CH:
+            o = ERR_CH
+
+        c = self._cache
+        buf = c.get(o)
+        if buf is not None:
+            del c[o]  # Move to most recently used
+            c[o] = buf
+            return memoryview(buf), self._height, self._width
+
+        if len(c) >= self._cache_size:  # Reuse least recently used glyph's buffer
+            old = next(iter(c))
+            buf = c.pop(old)
+        else:
+            buf = bytearray(self._size)
+        f = self._f
+        f.seek(_HEADER + (o - MIN_CH) * (self._size + 1) + 1)  # Skip advance width
+        f.readinto(buf)
+        self.reads += 1
+        c[o] = buf
+        return memoryview(buf), self._height, self._width
+
+    def close(self):
+        self._cache = OrderedDict()
+        if self._f is not None:
+            self._f.close()
+            self._f = None
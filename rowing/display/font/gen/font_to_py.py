@@ -30,6 +30,8 @@
 # THE SOFTWARE.
 
 import argparse
+import ast
+import string
 import sys
 import os
 import freetype
@@ -255,15 +257,18 @@ class Glyph(object):
 # height (in pixels) of all characters
 # width (in pixels) for monospaced output (advance width of widest char)
 class Font(dict):
-    def __init__(self, filename, size, minchar, maxchar, monospaced, defchar):
+    def __init__(self, filename, size, minchar, maxchar, monospaced, defchar, subset=None):
         super().__init__()
         self._face = freetype.Face(filename)
         if defchar is None: # Binary font
             self.charset = [chr(char) for char in range(minchar, maxchar + 1)]
         else:
             self.charset = [chr(defchar)] + [chr(char) for char in range(minchar, maxchar + 1)]
+        # Dimensions are those of the full range, so a subset font lays out as the full font
         self.max_width = self.get_dimensions(size)
         self.width = self.max_width if monospaced else 0
+        if subset is not None:  # Error character, then subset in order
+            self.charset = [chr(defchar)] + sorted(set(subset) - {chr(defchar)})
         for char in self.charset:  # Populate dictionary
             self._render_char(char)
 
@@ -367,28 +372,50 @@ def get_ch(ch):
  
 """
 
+# Sparse (character subset) font: index entry i + 1 is character _chars[i], entry 0 the error
+# character.
+STR02_SPARSE = """_mvfont = memoryview(_font)
+_chars = {}
+
+def _chr_addr(i):
+    return int.from_bytes(_index[2 * i:2 * i + 2], 'little')
+
+def get_ch(ch):
+    i = _chars.find(ch) + 1  # Error character if not in subset
+    offset = _chr_addr(i)
+    width = int.from_bytes(_font[offset:offset + 2], 'little')
+    next_offs = _chr_addr(i + 1)
+    return _mvfont[offset + 2:next_offs], {}, width
+
+"""
+
 def write_func(stream, name, arg):
     stream.write('def {}():\n    return {}\n\n'.format(name, arg))
 
 # filename, size, minchar=32, maxchar=126, monospaced=False, defchar=ord('?'):
 
-def write_font(op_path, font_path, height, monospaced, hmap, reverse, minchar, maxchar, defchar):
+def write_font(op_path, font_path, height, monospaced, hmap, reverse, minchar, maxchar, defchar,
+               subset=None):
     try:
-        fnt = Font(font_path, height, minchar, maxchar, monospaced, defchar)
+        fnt = Font(font_path, height, minchar, maxchar, monospaced, defchar, subset)
     except freetype.ft_errors.FT_Exception:
         print("Can't open", font_path)
         return False
     try:
         with open(op_path, 'w') as stream:
-            write_data(stream, fnt, font_path, monospaced, hmap, reverse, minchar, maxchar)
+            write_data(stream, fnt, font_path, monospaced, hmap, reverse, minchar, maxchar,
+                       subset is not None)
     except OSError:
         print("Can't open", op_path, 'for writing')
         return False
     return True
 
 
-def write_data(stream, fnt, font_path, monospaced, hmap, reverse, minchar, maxchar):
+def write_data(stream, fnt, font_path, monospaced, hmap, reverse, minchar, maxchar, sparse=False):
     height = fnt.height  # Actual height, not target height
+    if sparse:
+        minchar = ord(min(fnt.charset[1:] or fnt.charset))
+        maxchar = ord(max(fnt.charset[1:] or fnt.charset))
     stream.write(STR01.format(os.path.split(font_path)[1]))
     stream.write('\n')
     write_func(stream, 'height', height)
@@ -405,7 +432,68 @@ def write_data(stream, fnt, font_path, monospaced, hmap, reverse, minchar, maxch
     bw_index = ByteWriter(stream, '_index')
     bw_index.odata(index)
     bw_index.eot()
-    stream.write(STR02.format(minchar, minchar, maxchar, minchar, height))
+    if sparse:
+        stream.write(STR02_SPARSE.format(repr(''.join(fnt.charset[1:])), height))
+        print('Subset of {} characters (and error character), {} bytes of glyph data.'.format(
+            len(fnt.charset) - 1, len(data)))
+    else:
+        stream.write(STR02.format(minchar, minchar, maxchar, minchar, height))
+
+# CHARACTER SUBSETS
+
+# UI sources (relative to repository root) scanned for displayed text:
+UI_SOURCES = ('run.py', 'rowing/ui.py', 'rowing/split.py')
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', '..')
+
+_NUMERIC = '0123456789-. '  # Characters of any formatted number (sign, point, padding)
+
+
+def _format_chars(fmt):
+    """ Characters a format string can produce: its literal text, and those of numbers. """
+    chars = set()
+    for literal, field, spec, conv in string.Formatter().parse(fmt):
+        chars.update(literal)
+        if field is not None:
+            chars.update(_NUMERIC)
+    return chars
+
+
+def scan_charset(paths):
+    """
+    Collect characters of displayed text from Python sources: format strings (other than those
+    printed), strings returned by functions and lambdas, and chrome text of screen layouts.
+
+    :return: Set of characters
+    """
+    chars = set()
+    for path in paths:
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        printed = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and getattr(node.func, 'id', None) == 'print':
+                printed.update(id(n) for n in ast.walk(node))
+
+        for node in ast.walk(tree):
+            if id(node) in printed:
+                continue
+            if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and
+                    node.func.attr == 'format' and isinstance(node.func.value, ast.Constant) and
+                    isinstance(node.func.value.value, str)):
+                chars |= _format_chars(node.func.value.value)
+            elif isinstance(node, (ast.Return, ast.Lambda)):
+                v = node.value if isinstance(node, ast.Return) else node.body
+                if isinstance(v, ast.IfExp):
+                    values = (v.body, v.orelse)
+                else:
+                    values = (v,)
+                for v in values:
+                    if isinstance(v, ast.Constant) and isinstance(v.value, str):
+                        chars.update(v.value)
+            elif (isinstance(node, ast.Tuple) and node.elts and isinstance(node.elts[0], ast.Constant)
+                  and node.elts[0].value == 'text' and isinstance(node.elts[-1], ast.Constant)):
+                chars.update(node.elts[-1].value)  # Layout chrome text
+    return chars
 
 # BINARY OUTPUT
 # hmap reverse magic bytes
@@ -448,6 +536,11 @@ Illegal characters will be rendered as "?".
 
 To specify monospaced rendering issue:
 font_to_py.py FreeSans.ttf 23 --fixed freesans.py
+
+To include only some characters (others are rendered as the error character):
+font_to_py.py FreeSans.ttf 23 --charset "0123456789:.-" freesans.py
+or only those of the meter's UI text:
+font_to_py.py FreeSans.ttf 23 --scan-ui freesans.py
 """
 
 BINARY = """Invalid arguments. Binary (random access) font files support the standard ASCII
@@ -487,6 +580,12 @@ if __name__ == "__main__":
                         help = 'Ordinal value of error character default %(default)i ("?")',
                         default = 63)
 
+    parser.add_argument('-c', '--charset',
+                        type = str,
+                        help = 'Only include these characters (sparse font)')
+    parser.add_argument('-u', '--scan-ui', action='store_true',
+                        help='Only include characters of UI text, found in the UI sources (sparse font)')
+
     args = parser.parse_args()
     if not args.infile[0].isalpha():
         quit('Font filenames must be valid Python variable names.')
@@ -501,7 +600,8 @@ if __name__ == "__main__":
         if os.path.splitext(args.outfile)[1].upper() == '.PY':
             quit('Binary file must not have a .py extension.')
 
-        if args.smallest != 32 or args.largest != 126 or args.errchar != ord('?'):
+        if (args.smallest != 32 or args.largest != 126 or args.errchar != ord('?') or
+                args.charset is not None or args.scan_ui):
             quit(BINARY)
 
         print('Writing binary font file.')
@@ -523,10 +623,17 @@ if __name__ == "__main__":
         if args.errchar < 0 or args.errchar > 255:
             quit('--errchar must be between 0 and 255')
 
+        subset = None
+        if args.charset is not None or args.scan_ui:
+            subset = set(args.charset or '')
+            if args.scan_ui:
+                subset |= scan_charset(os.path.join(_ROOT, p) for p in UI_SOURCES)
+            print('Character subset: {!r}'.format(''.join(sorted(subset))))
+
         print('Writing Python font file.')
         if not write_font(args.outfile, args.infile, args.height, args.fixed,
                           args.xmap, args.reverse, args.smallest, args.largest,
-                          args.errchar):
+                          args.errchar, subset):
             sys.exit(1)
 
     print(args.outfile, 'written successfully.')
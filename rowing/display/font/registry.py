@@ -0,0 +1,118 @@
+"""
+Registry of fonts by name and size, loaded on first use.
+"""
+import gc
+import sys
+import utime
+
+from rowing.display.font.binfont import BinFont
+from rowing.display.glyphs import cache
+
+
+PACKAGE = 'rowing.display.font.packaged'  # Font modules
+BIN_EXT = '.bin'
+
+
+def _mem_alloc():
+    gc.collect()
+    return gc.mem_alloc() if hasattr(gc, 'mem_alloc') else 0
+
+
+class FontRegistry:
+    """
+    Fonts are resolved by name and size (e.g. ('arial', 12) -> `arial12`) when first requested,
+    from a binary font file if one exists in `bin_dir`, otherwise from the font module. Load time
+    and heap use are recorded per font.
+    """
+
+    def __init__(self, package=PACKAGE, bin_dir=None):
+        """
+        :param package: Package of font modules
+        :param bin_dir: Directory of binary fonts (see `BinFont`), preferred over modules
+        """
+        self.package = package
+        self.bin_dir = bin_dir
+        self._fonts = {}  # Key -> font
+        self._stats = {}  # Key -> load statistics
+
+    @staticmethod
+    def key(name, size):
+        return "{}{}".format(name, size)
+
+    def get(self, name, size):
+        """
+        :return: Font (module, or `BinFont`)
+        """
+        k = self.key(name, size)
+        f = self._fonts.get(k)
+        if f is None:
+            f = self._fonts[k] = self._load(k)
+        return f
+
+    def _load(self, k):
+        mem = _mem_alloc()
+        t = utime.ticks_us()
+
+        f = None
+        if self.bin_dir is not None:
+            try:
+                f = BinFont("{}/{}{}".format(self.bin_dir, k, BIN_EXT))
+            except OSError:
+                pass  # No binary font
+        if f is None:
+            mod = "{}.{}".format(self.package, k)
+            __import__(mod)
+            f = sys.modules[mod]
+
+        st = self._stats.setdefault(k, {'loads': 0})
+        st['loads'] += 1
+        st['load_us'] = utime.ticks_diff(utime.ticks_us(), t)
+        st['bytes'] = _mem_alloc() - mem
+        return f
+
+    def loaded(self):
+        """
+        :return: Keys of loaded fonts
+        """
+        return list(self._fonts)
+
+    def unload(self, k):
+        """ Release font (by key), and its cached glyphs. It is reloaded if requested again. """
+        f = self._fonts.pop(k, None)
+        if f is None:
+            return
+        cache.clear(f)
+        if isinstance(f, BinFont):
+            f.close()
+        else:
+            mod = "{}.{}".format(self.package, k)
+            if mod in sys.modules:
+                del sys.modules[mod]
+            pkg = sys.modules.get(self.package)
+            if pkg is not None and hasattr(pkg, k):
+                delattr(pkg, k)
+        gc.collect()
+
+    def retain(self, keys):
+        """ Unload all fonts other than those given (by key). """
+        for k in self.loaded():
+            if k not in keys:
+                self.unload(k)
+
+    def stats(self):
+        """
+        :return: Per font load statistics, by key
+        """
+        r = {}
+        for k, st in self._stats.items():
+            r[k] = dict(st)
+            r[k]['loaded'] = k in self._fonts
+        return r
+
+    def report(self):
+        """ Print per font load statistics. """
+        for k, st in self.stats().items():
+            print("Font {}: {}".format(k, st))
+
+
+fonts = FontRegistry()
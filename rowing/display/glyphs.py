@@ -0,0 +1,113 @@
+"""
+Cache of ready to blit glyph frame buffers, shared by all `TextBox`es.
+"""
+import framebuf
+from micropython import const
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ucollections import OrderedDict
+
+
+CACHE_SIZE = const(48)  # Glyphs kept per font (and per colour)
+
+
+def font_map(font):
+    """
+    :return: `framebuf` format of a font's glyphs, as cached
+    """
+    if font.hmap():
+        return framebuf.MONO_HMSB if font.reverse() else framebuf.MONO_HLSB
+    return framebuf.MONO_VLSB  # Vertically mapped glyphs are cached in the display's layout
+
+
+def _rev8(b):
+    """ Reverse bit order of byte. """
+    b = (b & 0xF0) >> 4 | (b & 0x0F) << 4
+    b = (b & 0xCC) >> 2 | (b & 0x33) << 2
+    return (b & 0xAA) >> 1 | (b & 0x55) << 1
+
+
+class GlyphCache:
+    """
+    Bounded least recently used cache of glyph frame buffers (and inverted variants), per font.
+    Once the glyphs in use are cached, rendering them allocates nothing.
+
+    Glyphs of vertically mapped fonts are stored as the display stores its frame (`MONO_VLSB`,
+    a row of bytes per page of 8 rows), so they can be copied into it a page at a time.
+    """
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._fonts = {}  # Font -> (normal, inverted) glyph caches
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, font, ch, invert=False):
+        """
+        :param font: Font (module, or object with the same interface)
+        :param ch: Character
+        :param invert: Inverted (black on white) variant
+        :return: (FrameBuffer, width, height, pages) of glyph. For vertically mapped fonts,
+            pages is (bytes, tail) -- glyph bytes by page, and a `FrameBuffer` of its last page
+            if partly filled (else None) -- otherwise None.
+        """
+        caches = self._fonts.get(font)
+        if caches is None:
+            caches = self._fonts[font] = (OrderedDict(), OrderedDict())
+        c = caches[1 if invert else 0]
+
+        g = c.get(ch)
+        if g is not None:
+            self.hits += 1
+            del c[ch]  # Move to most recently used
+            c[ch] = g
+            return g
+
+        self.misses += 1
+        g = self._build(font, ch, invert)
+        if len(c) >= self.size:
+            del c[next(iter(c))]  # Evict least recently used
+        c[ch] = g
+        return g
+
+    def clear(self, font=None):
+        """ Drop cached glyphs, of a single font if given. """
+        if font is None:
+            self._fonts = {}
+        elif font in self._fonts:
+            del self._fonts[font]
+
+    @staticmethod
+    def _build(font, ch, invert):
+        glyph, char_height, char_width = font.get_ch(ch)
+
+        if font.hmap():
+            buf = bytearray(glyph)
+        else:
+            # Columns of bytes (font_to_py vertical mapping) to rows of bytes by page:
+            n_pages = (char_height + 7) >> 3
+            buf = bytearray(n_pages * char_width)
+            rev = font.reverse()  # MSB at top
+            for c in range(char_width):
+                for p in range(n_pages):
+                    v = glyph[c * n_pages + p]
+                    buf[p * char_width + c] = _rev8(v) if rev else v
+        if invert:
+            for i, v in enumerate(buf):
+                buf[i] = 0xFF & ~ v
+
+        fb = framebuf.FrameBuffer(buf, char_width, char_height, font_map(font))
+        pages = None
+        if not font.hmap():
+            full = char_height >> 3
+            tail = None
+            if char_height & 7:
+                tail = framebuf.FrameBuffer(memoryview(buf)[full * char_width:], char_width,
+                                            char_height & 7, framebuf.MONO_VLSB)
+            pages = (memoryview(buf), tail)
+        return fb, char_width, char_height, pages
+
+
+cache = GlyphCache()
@@ -0,0 +1,54 @@
+from rowing.display.elements import Element
+from rowing.display.elements.text import TextBox
+
+
+class Screen:
+    """
+    A layout: named elements over static chrome (dividers, labels).
+
+    The chrome is drawn once, into a cached background buffer, the first time the screen is
+    shown. Switching to the screen afterwards copies that background into the frame, and redraws
+    the elements over it.
+    """
+
+    def __init__(self, name, chrome=(), fonts=None):
+        """
+        :param name: Screen name
+        :param chrome: Static content, tuple of drawing operations:
+            ('hline', x, y, w), ('vline', x, y, h), ('rect', x, y, w, h), ('fill_rect', x, y, w, h)
+            or ('text', x, y, font, string)
+        :param fonts: `FontRegistry`, for chrome text fonts given as (name, size)
+        """
+        self.name = name
+        self.chrome = chrome
+        self.fonts = fonts
+        self.els = []  # List of `Element`s
+        self.named = {}  # Element name -> `Element`
+        self.bg = None  # Background frame bytes, rendered on first show
+
+    def add(self, e: Element, name=None) -> Element:
+        if e in self.els: raise ValueError("Element already member.")
+
+        if name is not None:
+            e.name = name
+            self.named[name] = e
+        self.els.append(e)
+        return e
+
+    def get(self, name):
+        """
+        :return: Element of name, None if not on screen
+        """
+        return self.named.get(name)
+
+    def draw_chrome(self, dh):  # DisplayHandler
+        for op in self.chrome:
+            if op[0] == 'text':
+                font = op[3]
+                if isinstance(font, tuple):
+                    font = self.fonts.get(font[0], font[1])
+                t = TextBox(op[1], op[2], font)
+                t.text = op[4]
+                t.draw(dh)
+            else:
+                getattr(dh, op[0])(*(op[1:] + (1,)))
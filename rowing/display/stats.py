@@ -0,0 +1,155 @@
+"""
+Opt-in render pipeline instrumentation, enabled by giving a `RenderStats` to `DisplayHandler`.
+
+Times are recorded into fixed size histograms, so recording allocates nothing once an element
+has been seen.
+"""
+import array
+import utime
+
+
+BINS = 16  # Power of two bins, the last holds all larger values
+
+
+class Histogram:
+    """ Histogram with power of two bins: bin 0 holds 0, bin i holds [2^(i-1), 2^i). """
+
+    def __init__(self, bins=BINS):
+        self.bins = array.array('I', [0] * bins)
+        self.n = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, v):
+        i = 0
+        while v >> i and i < len(self.bins) - 1:
+            i += 1
+        self.bins[i] += 1
+        self.n += 1
+        self.total += v
+        if v > self.max: self.max = v
+
+    def reset(self):
+        for i in range(len(self.bins)):
+            self.bins[i] = 0
+        self.n = self.total = self.max = 0
+
+    def summary(self):
+        """
+        :return: Count, mean, max and non empty bins (by lower bound)
+        """
+        return {'n': self.n, 'avg': self.total // self.n if self.n else 0, 'max': self.max,
+                'hist': {(1 << i >> 1): c for i, c in enumerate(self.bins) if c}}
+
+
+class TimedLock:
+    """ Lock wrapper totalling acquisition wait time (us). """
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.wait_us = 0
+
+    def acquire(self):
+        t = utime.ticks_us()
+        r = self.lock.acquire()
+        self.wait_us += utime.ticks_diff(utime.ticks_us(), t)
+        return r
+
+    def release(self):
+        self.lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class RenderStats:
+    """
+    Per element draw times, and flush size, time and lock wait of each display update.
+
+    Lock wait is the time spent waiting for the display's bus during an update: for the coms lock
+    given to `DisplayHandler`, and for the shared I2C bus if the display's bus client is given.
+    """
+
+    def __init__(self, bins=BINS, bus=None):
+        """
+        :param bus: Display's `I2CClient`, if on a shared I2C bus
+        """
+        self._bins = bins
+        self.bus = bus
+        self.draw = {}  # Element -> draw time histogram (us)
+        self.flush_bytes = Histogram(bins)
+        self.flush_us = Histogram(bins)
+        self.lock_wait_us = Histogram(bins)
+        self._timed = None  # Last wrapped lock
+        self._wait0 = 0  # Total wait at start of flush
+
+    def element(self, e):
+        """
+        :return: Draw time histogram of element
+        """
+        h = self.draw.get(e)
+        if h is None:
+            h = self.draw[e] = Histogram(self._bins)
+        return h
+
+    @staticmethod
+    def label(e):
+        return e.name or "{}{}".format(type(e).__name__, id(e))
+
+    def lock(self, lock):
+        """
+        :return: Lock wrapped to record wait times, None if no lock
+        """
+        if lock is None:
+            return None
+        if self._timed is None or self._timed.lock is not lock:
+            self._timed = TimedLock(lock)
+        return self._timed
+
+    def _waited(self):
+        """ Total lock and bus wait so far (us). """
+        return ((self._timed.wait_us if self._timed is not None else 0) +
+                (self.bus.wait_us if self.bus is not None else 0))
+
+    def begin(self):
+        """ Start of flush (after `lock`). """
+        self._wait0 = self._waited()
+
+    def flush(self, sent, us):
+        """ End of flush. """
+        self.flush_bytes.add(sent)
+        self.flush_us.add(us)
+        self.lock_wait_us.add(self._waited() - self._wait0)
+
+    def reset(self):
+        for h in self.draw.values():
+            h.reset()
+        self.flush_bytes.reset()
+        self.flush_us.reset()
+        self.lock_wait_us.reset()
+
+    def summary(self):
+        return {'draw_us': {self.label(e): h.summary() for e, h in self.draw.items()},
+                'flush_bytes': self.flush_bytes.summary(),
+                'flush_us': self.flush_us.summary(),
+                'lock_wait_us': self.lock_wait_us.summary()}
+
+    def dump(self, log=None):
+        """
+        Output statistics.
+
+        :param log: `Log` to write to, otherwise printed
+        """
+        if log is not None:
+            log.log({'render': self.summary()})
+            return
+
+        for label, s in sorted(self.summary()['draw_us'].items()):
+            print("draw {}: {}".format(label, s))
+        print("flush bytes: {}".format(self.flush_bytes.summary()))
+        print("flush us: {}".format(self.flush_us.summary()))
+        print("lock wait us: {}".format(self.lock_wait_us.summary()))
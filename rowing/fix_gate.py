@@ -0,0 +1,73 @@
+from devices.adafruit_gps import GPS, GPSPoint, point_m_dist
+
+from rowing.loc_track import KT_TO_MS
+
+
+MIN_SATS = 5
+MAX_HDOP = 4.0
+MAX_SPEED = 8.0  # m/s -- Faster than any shell
+DEADBAND = 2.0  # m -- Scaled by HDOP (when above 1)
+STATIONARY_SPD = 0.5  # m/s -- Doppler speed below which the boat is taken as stationary
+MAX_REJECT_RUN = 10  # Consecutive implausible fixes before restarting from the newest
+
+
+class FixGate:
+    """
+    Outlier gate for distance accumulation.
+
+    Fixes are rejected on poor fix quality / dilution of precision, on implausible implied speed
+    from the last accepted fix (multipath jumps), and while stationary within a deadband of the
+    last accepted fix (drift). Each check is constant time; counts of accepted and rejected fixes
+    are kept by reason.
+    """
+
+    def __init__(self, min_sats=MIN_SATS, max_hdop=MAX_HDOP, max_speed=MAX_SPEED, deadband=DEADBAND):
+        self.min_sats = min_sats
+        self.max_hdop = max_hdop
+        self.max_speed = max_speed
+        self.deadband = deadband
+
+        self.counts = {'ok': 0, 'quality': 0, 'dop': 0, 'speed': 0, 'drift': 0}
+        self._anchor = None  # Last accepted point
+        self._run = 0  # Consecutive implied speed rejections
+
+    def _reject(self, reason):
+        self.counts[reason] += 1
+        return None
+
+    def step(self, gps: GPS, p: GPSPoint):
+        """
+        Check new fix.
+
+        :param gps: GPS (for fix quality details)
+        :param p: New point (`ts` in ms)
+        :return: Distance from last accepted fix (m), or None if rejected (or first fix)
+        """
+        if not gps.has_fix or (gps.satellites is not None and gps.satellites < self.min_sats):
+            return self._reject('quality')
+        hdop = gps.horizontal_dilution
+        if hdop is not None and hdop > self.max_hdop:
+            return self._reject('dop')
+
+        a = self._anchor
+        if a is None:
+            self._anchor = p
+            return None
+
+        d = point_m_dist(a, p)
+        dt = p.ts - a.ts
+        if dt > 0 and d * 1000 > self.max_speed * dt:
+            self._run += 1
+            if self._run >= MAX_REJECT_RUN:  # Anchor was likely the outlier
+                self._run = 0
+                self._anchor = p
+            return self._reject('speed')
+        self._run = 0
+
+        deadband = self.deadband * hdop if hdop is not None and hdop > 1 else self.deadband
+        if d < deadband and (p.spd is None or p.spd * KT_TO_MS < STATIONARY_SPD):
+            return self._reject('drift')
+
+        self.counts['ok'] += 1
+        self._anchor = p
+        return d
@@ -0,0 +1,152 @@
+"""
+GPS / accelerometer fusion for speed and distance estimates at the accelerometer rate.
+"""
+import _thread
+
+from rowing.util.clock import clock
+
+
+MAX_DT = 0.5  # s -- Longest prediction step (guards against stalled threads)
+BIAS_TC = 5000  # ms -- Time constant of the along-track gravity/tilt bias estimate
+
+
+class SpeedFusion:
+    """
+    Two state (distance, speed) Kalman filter.
+
+    Predicted from along-track acceleration on every accelerometer sample, and corrected by
+    GPS speed and distance on every fix. State and covariance are plain floats, so memory
+    and per-sample cost are constant.
+    """
+
+    def __init__(self, axis=0, sign=1, q_acc=0.5, r_spd=0.05, r_dist=4.0):
+        """
+        :param axis: Accelerometer axis aligned with the boat (0: x, 1: y, 2: z)
+        :param sign: 1 if the axis points towards the bow, otherwise -1
+        :param q_acc: Along-track acceleration noise variance ((m/s^2)^2)
+        :param r_spd: GPS speed measurement variance ((m/s)^2)
+        :param r_dist: GPS distance measurement variance (m^2)
+        """
+        self.axis = axis
+        self.sign = sign
+        self.q_acc = q_acc
+        self.r_spd = r_spd
+        self.r_dist = r_dist
+
+        self._lock = _thread.allocate_lock()
+        self._init = False  # Has been seeded by a GPS fix?
+        self._t_last = None  # Last accelerometer sample time (ms)
+        self._bias = 0.  # Along-track acceleration bias (m/s^2)
+
+        # State:
+        self._d = 0.  # Distance (m)
+        self._v = 0.  # Speed (m/s)
+        self._d_out = 0.  # Reported distance (kept monotone)
+
+        # Covariance (symmetric):
+        self._p00 = 0.
+        self._p01 = 0.
+        self._p11 = 0.
+
+    @property
+    def speed(self):
+        """
+        :return: Estimated speed (m/s)
+        """
+        return self._v if self._v > 0 else 0.
+
+    @property
+    def dist(self):
+        """
+        :return: Estimated distance travelled (m)
+        """
+        return self._d_out
+
+    def accel_tick(self, acc, t=None):
+        """
+        Predict state forward with a new accelerometer sample.
+
+        :param acc: Acceleration tuple (m/s^2)
+        :param t: Sample time (`clock.now_ms`), defaults to now
+        """
+        if t is None: t = clock.now_ms()
+        a = acc[self.axis] * self.sign
+
+        with self._lock:
+            if self._t_last is None:
+                self._t_last = t
+                self._bias = a
+                return
+            dt_ms = t - self._t_last
+            self._t_last = t
+            if dt_ms <= 0: return
+
+            # Slowly track gravity/tilt component on the along-track axis:
+            k = dt_ms / BIAS_TC
+            if k > 1: k = 1
+            self._bias += (a - self._bias) * k
+            if not self._init: return  # Wait for GPS to seed state
+
+            dt = dt_ms / 1000.
+            if dt > MAX_DT: dt = MAX_DT
+            self._predict(a - self._bias, dt)
+
+    def gps_tick(self, spd=None, dist=None):
+        """
+        Correct state with a new GPS fix.
+
+        :param spd: GPS speed (m/s)
+        :param dist: GPS derived distance travelled (m)
+        """
+        with self._lock:
+            if not self._init:
+                if spd is None or dist is None: return
+                self._d = dist
+                self._v = spd
+                self._p00 = self.r_dist
+                self._p11 = self.r_spd
+                self._init = True
+            else:
+                if spd is not None: self._correct_spd(spd)
+                if dist is not None: self._correct_dist(dist)
+
+            if self._d > self._d_out:
+                self._d_out = self._d
+
+    def _predict(self, a, dt):
+        dt2 = dt * dt
+        self._d += self._v * dt + 0.5 * a * dt2
+        self._v += a * dt
+
+        q = self.q_acc
+        p01, p11 = self._p01, self._p11
+        self._p00 += 2 * dt * p01 + dt2 * p11 + q * dt2 * dt2 / 4
+        self._p01 = p01 + dt * p11 + q * dt2 * dt / 2
+        self._p11 = p11 + q * dt2
+
+        if self._d > self._d_out:
+            self._d_out = self._d
+
+    def _correct_spd(self, z):
+        p00, p01, p11 = self._p00, self._p01, self._p11
+        s = p11 + self.r_spd
+        k0 = p01 / s
+        k1 = p11 / s
+        y = z - self._v
+        self._d += k0 * y
+        self._v += k1 * y
+        self._p00 = p00 - k0 * p01
+        self._p01 = p01 - k0 * p11
+        self._p11 = p11 - k1 * p11
+
+    def _correct_dist(self, z):
+        p00, p01, p11 = self._p00, self._p01, self._p11
+        s = p00 + self.r_dist
+        k0 = p00 / s
+        k1 = p01 / s
+        y = z - self._d
+        self._d += k0 * y
+        self._v += k1 * y
+        self._p00 = p00 - k0 * p00
+        self._p01 = p01 - k0 * p01
+        self._p11 = p11 - k1 * p01
@@ -4,12 +4,43 @@ Main module for interfacing to hardware in and attached to the HUZZAH32
 Written by Lucien Gaitskell (2018)
 """
 
-from machine import UART, I2C, Pin, SPI, RTC
+from machine import UART, Pin, SPI
 import utime
 import os
 
 
 from devices import adafruit_lis3dh, adafruit_sdcard, ssd1306, esp32_batv, adafruit_gps, sim800l
+from devices.support.i2c_bus import I2CBus, PRI_LOW, PRI_HIGH
+from rowing.util.clock import clock
+
+
+# OLED wiring:
+OLED_I2C = 'i2c'
+OLED_SPI = 'spi'
+
+OLED_RST = 15
+# SPI wiring (HSPI peripheral; MOSI routed through the GPIO matrix, as 13 is the power button):
+OLED_SCK = 14
+OLED_MOSI = 32
+OLED_DC = 25
+OLED_CS = 26
+OLED_SPI_RATE = 10 * 1024 * 1024  # Hz
+
+
+def oled_i2c(bus: I2CBus):
+    """ Build OLED on shared I2C bus. """
+    rst = Pin(OLED_RST, mode=Pin.OUT)
+    rst.value(0)
+    utime.sleep_ms(20)
+    rst.value(1)
+    utime.sleep_ms(20)
+    return ssd1306.SSD1306_I2C(128, 64, bus.client('oled', PRI_LOW))
+
+
+def oled_spi():
+    """ Build OLED on its own SPI bus. """
+    spi = SPI(1, baudrate=OLED_SPI_RATE, polarity=0, phase=0, sck=Pin(OLED_SCK), mosi=Pin(OLED_MOSI))
+    return ssd1306.SSD1306_SPI(128, 64, spi, Pin(OLED_DC), Pin(OLED_RST), Pin(OLED_CS), rate=OLED_SPI_RATE)
 
 '''
 from rowing.devices import adafruit_gps
@@ -30,7 +61,11 @@ class Hardware:
 
     SD_PATH = '/sd'
 
-    def __init__(self, sd=True):
+    def __init__(self, sd=True, hw_i2c=True, oled=OLED_I2C):
+        """
+        :param hw_i2c: Use hardware I2C peripheral
+        :param oled: OLED wiring, `OLED_I2C` or `OLED_SPI`
+        """
         # ESP32 Battery:
         self.battery = esp32_batv.BatteryVoltage()
 
@@ -39,19 +74,21 @@ class Hardware:
             UART(1, 9600, timeout=3000, tx=17, rx=16)
         )
 
-        # Software I2C bus setup:
-        self.i2c = I2C(-1, sda=Pin(23), scl=Pin(22), freq=800000)
+        # Shared I2C bus setup (accelerometer transactions take priority over display):
+        self.i2c_bus = I2CBus(sda=23, scl=22, hw=hw_i2c)
 
         # OLED setup:
-        self._oled_rst = Pin(15, mode=Pin.OUT)
-        self._oled_rst.value(0)
-        utime.sleep_ms(20)
-        self._oled_rst.value(1)
-        utime.sleep_ms(20)
-        self.oled = ssd1306.SSD1306_I2C(128, 64, self.i2c)
+        self.oled_bus = None  # OLED's I2C bus client, if on I2C
+        if oled == OLED_SPI:
+            self.oled = oled_spi()
+        elif oled == OLED_I2C:
+            self.oled = oled_i2c(self.i2c_bus)
+            self.oled_bus = self.oled.i2c
+        else:
+            raise ValueError("Unknown OLED wiring: {}".format(oled))
 
         # Accelerometer setup:
-        self.accel = adafruit_lis3dh.LIS3DH_I2C(self.i2c)
+        self.accel = adafruit_lis3dh.LIS3DH_I2C(self.i2c_bus.client('accel', PRI_HIGH))
         self.accel.data_rate = adafruit_lis3dh.DATARATE_400_HZ
 
         # SD Card:
@@ -72,15 +109,10 @@ class Hardware:
 
         while True:  # Loop until ready
             self.gps.update()
-            t = self.gps.timestamp_utc
-            if t is not None:
+            if clock.gps_sync(self.gps.timestamp_utc):  # Sets RTC (local time) on first sync
                 gps_success -= 1
                 if gps_success <= 0:
-                    RTC().datetime(
-                        (t.tm_year, t.tm_mon, t.tm_mday, t.tm_wday,
-                         (t.tm_hour + 20) % 24,  # Correct for timezone (UTC -> EST)
-                         t.tm_min, t.tm_sec, None))
-                    print("Time is now: {}".format(RTC().datetime()))
+                    print("Time is now: {}".format(clock.localtime()))
                     break
 
     def run_splash(self):
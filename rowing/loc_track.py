@@ -1,22 +1,55 @@
 from devices.adafruit_gps import GPS, GPSPoint, point_m_dist
 
+from rowing.util.clock import clock
+
 import uasyncio as asyncio
 import utime
 
 
 POINT_TRACK_TIMEOUT = 20
+KT_TO_MS = 0.5144  # <- m/s = 1 kt
+MAX_SENTENCE = 128  # Longest buffered partial sentence (bytes), longer is discarded as noise
+SPD_GAP = 5000  # ms -- Longest fix interval integrated over
+
+# Distance sources:
+DIST_POS = 0  # Position differences
+DIST_SPD = 1  # Integrated Doppler speed
+DIST_BLEND = 2  # Weighted blend of both
+
+
+def _read_available(uart):
+    """ Wait (in the event loop poller) for UART data, then read what has arrived. """
+    yield asyncio.IORead(uart)
+    n = uart.any()
+    return uart.read(n) if n else b''
+
+
+def _read_done(uart):
+    """ Remove UART from the event loop poller. """
+    yield asyncio.IOReadDone(uart)
 
 
 class LocTracker:
-    def __init__(self, gps: GPS, log, sd_lock, dist_enabler: callable = None):
+    def __init__(self, gps: GPS, log, sd_lock, dist_enabler: callable = None, fusion=None, split=None,
+                 simplify=None, gate=None):
         self.gps = gps
+        self.fusion = fusion  # Speed/distance fusion filter (optional)
+        self.split = split  # Split tracker (optional)
+        self.simplify = simplify  # Logged track simplifier (optional, logs every point if None)
+        self.gate = gate  # Distance outlier gate (optional)
         #self.points = []
 
         self.running = False
 
         self.last_point_time = None
         self.last_point = None
-        self.dist = 0
+        self.dist_pos = 0  # Position derived distance (m)
+        self.dist_spd = 0  # Doppler speed derived distance (m)
+        self.dist_mode = DIST_BLEND
+        self.blend = 0.7  # Weight of speed derived distance when blending
+        self._dist_off = 0  # Offset keeping `dist` continuous across source changes (m)
+        self._spd_t = None  # Last speed sample time (ms)
+        self._spd_last = None  # Last speed sample (m/s)
         self.l = log
         self.sd_lock = sd_lock
         if dist_enabler is not None:
@@ -24,25 +57,80 @@ class LocTracker:
         else:
             self.dist_en = True
 
+    @property
+    def dist(self):
+        """
+        :return: Distance travelled (m), from the selected source. Changing source does not make
+            it jump: only distance travelled since comes from the new source.
+        """
+        if self.dist_mode == DIST_POS:
+            d = self.dist_pos
+        elif self.dist_mode == DIST_SPD:
+            d = self.dist_spd
+        else:
+            d = self.blend * self.dist_spd + (1 - self.blend) * self.dist_pos
+        return d + self._dist_off
+
+    def set_dist_mode(self, mode, blend=None):
+        """
+        Select distance source.
+
+        :param mode: One of `DIST_POS`, `DIST_SPD` or `DIST_BLEND`
+        :param blend: Weight of speed derived distance when blending [0,1]
+        """
+        if mode not in (DIST_POS, DIST_SPD, DIST_BLEND):
+            raise ValueError("Not valid distance mode.")
+        if blend is not None and not 0 <= blend <= 1:
+            raise ValueError("Blend needs to be [0,1]")
+
+        d = self.dist
+        if blend is not None:
+            self.blend = blend
+        self.dist_mode = mode
+        self._dist_off += d - self.dist  # Continue from current distance
+
+    def _update(self, raw=None):
+        """
+        Parse one GPS sentence.
+
+        :param raw: Sentence read from UART (bytes), otherwise read by driver
+        :return: If successful
+        """
+        try:
+            self.gps.update(raw)
+        except ValueError as e:
+            print("GPS Decode Error: {}".format(e))
+            with self.sd_lock: self.l.log({'event': "READ_FAIL", 'desc': "DECODE_ERROR", 'error': str(e)})
+            return False
+        except Exception as e:
+            print("General GPS ERROR")
+            with self.sd_lock: self.l.log({'event': "READ_FAIL", 'desc': "GENERAL_ERROR", 'error': str(e)})
+            return False
+        clock.gps_sync(self.gps.timestamp_utc)
+        return True
+
     def data_tick(self):
         new_d = False  # Prevent overlogging -- flags if new data read
         while self.gps.any_updates():  # Process through all available updates
             new_d = True
-            try:
-                self.gps.update()
-            except ValueError as e:
-                print("GPS Decode Error: {}".format(e))
-                with self.sd_lock: self.l.log({'event': "READ_FAIL", 'desc': "DECODE_ERROR", 'error': str(e)})
-                return
-            except Exception as e:
-                print("General GPS ERROR")
-                with self.sd_lock: self.l.log({'event': "READ_FAIL", 'desc': "GENERAL_ERROR", 'error': str(e)})
-                return
+            if not self._update(): return
 
         if not new_d: return False  # Return if no new data
+        return self._fix_tick()
 
+    def sentence_tick(self, raw):
+        """
+        Process a single sentence read from the GPS UART.
+
+        :param raw: Complete sentence (bytes)
+        """
+        if not self._update(raw): return
+        if raw[3:6] == b'RMC':  # Once per fix (RMC carries speed)
+            self._fix_tick()
+
+    def _fix_tick(self):
         # Every second print out current location details if there's a fix.
-        current = utime.time()
+        current = clock.now_ms()
 
         if not self.gps.has_fix:
             # Try again if we don't have a fix yet.
@@ -50,29 +138,88 @@ class LocTracker:
             print('Waiting for fix...')
             return
 
-        new_point = GPSPoint.from_current(self.gps)
+        new_point = GPSPoint.from_current(self.gps, ts=current)
 
-        with self.sd_lock:
-            self.l.log({'lat': new_point.lat, 'lon': new_point.lon, 'spd': new_point.spd})
+        if self.simplify is None:
+            with self.sd_lock:
+                self.l.log({'lat': new_point.lat, 'lon': new_point.lon, 'spd': new_point.spd})
+        else:
+            self._log_point(self.simplify.push(new_point))
+
+        moving = self.dist_en is True or (callable(self.dist_en) and self.dist_en())
+
+        # Integrate Doppler speed over (ms precision) fix interval:
+        spd = new_point.spd * KT_TO_MS if new_point.spd is not None else None
+        if spd is not None and self._spd_t is not None and moving:
+            dt = current - self._spd_t
+            if dt <= SPD_GAP:
+                self.dist_spd += (spd + self._spd_last) * dt / 2000.
+        self._spd_t = current if spd is not None else None
+        self._spd_last = spd
 
-        # Track/Update distance count every half second:
-        if self.last_point_time is None or current - self.last_point_time >= 0.5:
+        # Track/Update position distance count every half second:
+        if self.last_point_time is None or current - self.last_point_time >= 500:
             self.last_point_time = current
 
+            # Movement distance from last point (or last accepted point if gated):
+            d = None
+            if self.gate is not None:
+                d = self.gate.step(self.gps, new_point)
+            elif self.last_point is not None:
+                d = point_m_dist(new_point, self.last_point)
+
+            # Add new point movement distance to total (if enabled)
+            if d is not None and moving:
+                self.dist_pos += d
+
             if self.last_point is not None:
-                # Add new point movement distance to total (if enabled)
-                if self.dist_en is True or (callable(self.dist_en) and self.dist_en()):
-                    self.dist += point_m_dist(new_point, self.last_point)
+                if self.fusion is not None:
+                    self.fusion.gps_tick(spd, self.dist)
 
                 #if current-self.last_point.ts >= POINT_TRACK_TIMEOUT:
                 #    self.points.append(new_point)
             self.last_point = new_point
+
+        if moving and self.split is not None:
+            self.split.add(self.dist)
         return True
 
-    async def run_async(self, delay=500):
-        while True:
-            self.data_tick()
-            await asyncio.sleep(delay/1000.)
+    def _log_point(self, p):
+        """ Log simplified track point (with its own fix time, as it may have been held back). """
+        if p is None or self.l.fbuf is None: return  # Nothing to log, or log not opened
+        with self.sd_lock:
+            self.l.log({'lat': p.lat, 'lon': p.lon, 'spd': p.spd, 'pts': clock.epoch_us(p.ts)})
+
+    def close(self):
+        """
+        Flush any held back track points, and gate counts, to the log. Nothing is logged if the
+        log was never opened (e.g. setup failed), so closing is safe on any exit path.
+        """
+        if self.l.fbuf is None:
+            return
+        if self.simplify is not None:
+            self._log_point(self.simplify.flush())
+        if self.gate is not None:
+            with self.sd_lock:
+                self.l.log({'gate': self.gate.counts})
+
+    async def run_async(self):
+        """ Process GPS sentences as they arrive, each as its own step in the event loop. """
+        self.running = True
+        uart = self.gps.uart
+        rx = b''
+        while self.running:
+            rx += await _read_available(uart)
+            while True:
+                end = rx.find(b'\n')
+                if end < 0: break
+                line = rx[:end + 1]
+                rx = rx[end + 1:]
+                self.sentence_tick(line)
+                await asyncio.sleep(0)  # Yield between sentences
+            if len(rx) > MAX_SENTENCE:
+                rx = b''
+        await _read_done(uart)
 
     def thread(self, delay=500):
         self.running = True
@@ -0,0 +1,109 @@
+"""
+Streaming simplification of GPS tracks.
+
+Only points needed to keep the reconstructed (straight line) track within a given error are
+emitted. Points are compared against the last emitted point (radial distance, removes drift at
+rest), and held back points against the segment from it to the newest point (Douglas-Peucker over
+a bounded window, removes points along straight runs).
+"""
+import math
+
+
+EARTH_RADIUS = 6.371 * 10 ** 6  # m
+
+
+class TrackSimplifier:
+    def __init__(self, tolerance=2.0, window=16):
+        """
+        :param tolerance: Maximum distance of dropped points from the simplified track (m).
+            0 keeps the full resolution track.
+        :param window: Maximum number of points held back before one is emitted
+        """
+        self.tolerance = tolerance
+        self.window = window
+
+        self._anchor = None  # Last emitted point
+        self._cos_lat = 1.  # Longitude scale at anchor
+        self._buf = []  # Held back points, as (x, y, point) relative to anchor (m)
+        self._last = None  # Newest point dropped as too close
+
+    def _project(self, p):
+        a = self._anchor
+        return (math.radians(p.lon - a.lon) * self._cos_lat * EARTH_RADIUS,
+                math.radians(p.lat - a.lat) * EARTH_RADIUS)
+
+    def _set_anchor(self, p):
+        self._anchor = p
+        self._cos_lat = math.cos(math.radians(p.lat))
+
+    def _near(self, x, y):
+        """ If (x, y) is within tolerance of anchor. """
+        return x * x + y * y < self.tolerance * self.tolerance
+
+    def _fits(self, x, y):
+        """ If all held back points are within tolerance of the segment from anchor to (x, y). """
+        seg2 = x * x + y * y
+        tol2 = self.tolerance * self.tolerance
+        for bx, by, _ in self._buf:
+            # Nearest point of segment (projection clamped to its ends):
+            u = 0. if seg2 == 0 else (bx * x + by * y) / seg2
+            if u < 0.: u = 0.
+            elif u > 1.: u = 1.
+            dx, dy = bx - u * x, by - u * y
+            if dx * dx + dy * dy > tol2:
+                return False
+        return True
+
+    def push(self, p):
+        """
+        Add new point.
+
+        :param p: Point, with `lat` and `lon` attributes (degrees)
+        :return: Point to be logged, or None
+        """
+        if self.tolerance <= 0:  # Full resolution
+            return p
+        if self._anchor is None:
+            self._set_anchor(p)
+            return p
+
+        x, y = self._project(p)
+
+        # Radial distance to last emitted point, while nothing is held back (a later segment from
+        # it then passes within tolerance). Otherwise the point is held back, and checked below.
+        if not self._buf and self._near(x, y):
+            self._last = p
+            return None
+        self._last = None
+
+        if len(self._buf) < self.window and self._fits(x, y):
+            self._buf.append((x, y, p))
+            return None
+
+        # Segment no longer fits -- emit last held back point and restart from it:
+        out = self._buf[-1][2] if self._buf else p
+        self._set_anchor(out)
+        self._buf = []
+        if out is not p:
+            x, y = self._project(p)
+            if self._near(x, y):
+                self._last = p
+            else:
+                self._buf.append((x, y, p))
+        return out
+
+    def flush(self):
+        """
+        End current track.
+
+        :return: Last point to be logged, or None
+        """
+        out = None
+        if self._buf:
+            out = self._buf[-1][2]
+        elif self._last is not None:
+            out = self._last
+        self._anchor = None
+        self._buf = []
+        self._last = None
+        return out
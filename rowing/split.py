@@ -0,0 +1,152 @@
+from array import array
+from micropython import const
+
+from rowing.util.clock import clock
+
+
+SPLIT_DIST = const(500)  # m
+SPLIT_WINDOW = const(10000)  # ms -- Default window of the current split
+GAP_TIMEOUT = const(5000)  # ms -- Sample gap treated as a pause (restarts windows)
+
+
+def format_split(split, tenths=True):
+    """
+    :param split: Split time (ms), or None
+    :param tenths: Include tenths of a second
+    :return: Split formatted as 'm:ss.s' (or 'm:ss')
+    """
+    if split is None or split >= 600000:
+        return "-:--.-" if tenths else "-:--"
+    mins, ms = divmod(int(split), 60000)
+    if tenths:
+        return "{:01}:{:02}.{:01}".format(mins, ms // 1000, (ms % 1000) // 100)
+    return "{:01}:{:02}".format(mins, ms // 1000)
+
+
+class _Window:
+    """ Fixed capacity FIFO of (time, distance) samples. """
+
+    def __init__(self, size):
+        self._t = array('i', (0 for _ in range(size)))
+        self._d = array('f', (0 for _ in range(size)))
+        self._size = size
+        self._head = 0  # Index of oldest sample
+        self.n = 0  # Number of samples
+
+    def clear(self):
+        self._head = 0
+        self.n = 0
+
+    def push(self, t, d):
+        if self.n == self._size:  # Full -- drop oldest
+            self.popleft()
+        idx = (self._head + self.n) % self._size
+        self._t[idx] = t
+        self._d[idx] = d
+        self.n += 1
+
+    def popleft(self):
+        self._head = (self._head + 1) % self._size
+        self.n -= 1
+
+    def t(self, i):
+        return self._t[(self._head + i) % self._size]
+
+    def d(self, i):
+        return self._d[(self._head + i) % self._size]
+
+
+class SplitTracker:
+    """
+    Rolling split (time per 500 m) engine.
+
+    Fed with monotone (time, cumulative distance) samples, and keeps two queues: one spanning
+    the last `SPLIT_DIST` metres, and one spanning the last `window` ms. Queues are trimmed
+    from the front as samples arrive, so each sample costs O(1) amortized and every query is O(1).
+    """
+
+    def __init__(self, window=SPLIT_WINDOW, size=600):
+        """
+        :param window: Current split window (ms)
+        :param size: Capacity of each sample queue
+        """
+        self.window = window
+        self._dist_q = _Window(size)
+        self._time_q = _Window(size)
+
+        self._t_last = None  # Last sample time (ms)
+        self._t = 0  # Moving time (ms)
+        self._d = 0.  # Last cumulative distance (m)
+        self._d_start = None  # Distance at first sample (m)
+
+    def add(self, d, t=None):
+        """
+        Add new sample.
+
+        :param d: Cumulative distance (m)
+        :param t: Sample time (`clock.now_ms`), defaults to now
+        """
+        if t is None: t = clock.now_ms()
+        if self._t_last is not None:
+            dt = t - self._t_last
+            if dt > GAP_TIMEOUT:  # Paused -- restart windows
+                self._dist_q.clear()
+                self._time_q.clear()
+            elif dt > 0:
+                self._t += dt
+        else:
+            self._d_start = d
+        self._t_last = t
+        self._d = d
+
+        self._dist_q.push(self._t, d)
+        self._time_q.push(self._t, d)
+
+        # Keep a single sample at or behind the split distance:
+        q = self._dist_q
+        while q.n >= 2 and q.d(1) <= d - SPLIT_DIST:
+            q.popleft()
+
+        # Keep a single sample at or behind the window start:
+        q = self._time_q
+        while q.n >= 2 and q.t(1) <= self._t - self.window:
+            q.popleft()
+
+    @property
+    def last_split(self):
+        """
+        :return: Time taken over the last 500 m (ms), None if not yet covered
+        """
+        q = self._dist_q
+        target = self._d - SPLIT_DIST
+        if q.n < 2 or q.d(0) > target:
+            return None
+        t0, d0 = q.t(0), q.d(0)
+        t1, d1 = q.t(1), q.d(1)
+        t_at = t0 + (t1 - t0) * (target - d0) / (d1 - d0) if d1 > d0 else t0
+        return self._t - t_at
+
+    @property
+    def current_split(self):
+        """
+        :return: Split over the last `window` ms (ms per 500 m), None if not moving
+        """
+        q = self._time_q
+        if q.n < 2:
+            return None
+        dd = self._d - q.d(0)
+        if dd <= 0:
+            return None
+        return SPLIT_DIST * (self._t - q.t(0)) / dd
+
+    @property
+    def avg_split(self):
+        """
+        :return: Average split since the first sample (ms per 500 m), None if not moving
+        """
+        if self._d_start is None:
+            return None
+        dd = self._d - self._d_start
+        if dd <= 0:
+            return None
+        return SPLIT_DIST * self._t / dd
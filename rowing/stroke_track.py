@@ -12,9 +12,13 @@ STROKE_THRESH = 2.0  # m/s^2
 GRAV_CONST = 9.81  # m/s^2
 
 class StrokeTracker:
-    def __init__(self, accel: LIS3DH_I2C, log: TransLog, i2c_lock, sd_lock):
+    def __init__(self, accel: LIS3DH_I2C, log: TransLog, i2c_lock, sd_lock, fusion=None):
+        """
+        :param i2c_lock: Lock held around accelerometer reads, None if the bus arbitrates
+        """
         self._acc = accel  # Accelerometer
         self._log = log  # Log
+        self.fusion = fusion  # Speed/distance fusion filter (optional)
 
         self.running = False
 
@@ -28,13 +32,18 @@ class StrokeTracker:
 
     def data_tick(self):
         try:
-            with self.i2c_lock:
+            if self.i2c_lock is not None:  # Use coms lock if given
+                with self.i2c_lock:
+                    acc = self._acc.acceleration
+            else:
                 acc = self._acc.acceleration
             a_mag = abs((acc.x**2 + acc.y**2 + acc.z**2) ** (1/2) - GRAV_CONST)  # Read accelerometer magnitude
         except:
             with self.sd_lock: self._log.log({'state': "ERROR", 'desc': "Failed to read"})
             a_mag = 0
         else:
+            if self.fusion is not None:
+                self.fusion.accel_tick(acc)
             with self.sd_lock:
                 self._log.log({'x': acc.x, 'y': acc.y, 'z': acc.z, 'mag': a_mag, 'spm': self.stroke_rate})
 
@@ -4,9 +4,13 @@ from micropython import const
 
 # UI
 from rowing.display import DisplayHandler
+from rowing.display.screen import Screen
 from rowing.display.elements.text import TextBox
 from rowing.display.elements.bar import Bar
-from rowing.display.font.packaged import arial10, arial12, arial20, arial25, arial15
+from rowing.display.elements.chart import Chart
+from rowing.display.font.registry import fonts as _fonts, FontRegistry
+
+from rowing.util.clock import clock
 
 
 _WIDTH = const(128)
@@ -15,6 +19,7 @@ _HEIGHT = const(64)
 # Y:
 _HEADER = const(10)
 _FOOTER = const(_HEIGHT - 22)
+_BODY = const(16)  # Large body text
 
 # X:
 _Q1 = int(_WIDTH / 4) - 1
@@ -22,35 +27,203 @@ _T1 = int(_WIDTH / 3) - 1
 _CENTER = int(_WIDTH / 2) - 1
 _Q3 = int(3 * _WIDTH / 4) - 1
 
+MAX_WAIT = 1000  # ms -- Longest time between refreshes
+
+# Fonts (name, size), loaded when a screen using them is shown:
+_A10 = ('arial', 10)
+_A12 = ('arial', 12)
+_A15 = ('arial', 15)
+_A20 = ('arial', 20)
+_A25 = ('arial', 25)
+
+
+# Layouts -- text fields as (name, x, y, font, diff), static chrome (see `Screen`), and optionally
+# charts as (name, x0, y0, x1, y1, lo, hi):
+_HEADER_FIELDS = (
+    ('time', 0, 0, _A10, False),
+    ('batv', 42, 0, _A10, False),
+    ('speed', 72, 0, _A10, True),
+    ('gps', 108, 0, _A10, False),
+)
+_HEADER_CHROME = (
+    ('hline', 0, _HEADER, _WIDTH),
+)
+
+RACE = ('race', _HEADER_FIELDS + (
+    ('stroke', 9, _BODY, _A25, True),
+    ('split', _CENTER + 6, _BODY, _A25, True),  # Current split
+    ('split_500', _T1 + 2, _HEADER + 4, _A10, False),  # Last 500 m split
+    ('split_avg', _T1 + 2, _HEADER + 17, _A10, False),  # Average split
+    ('chrono', 2, _FOOTER + 6, _A12, True),
+    ('distance', _CENTER + 8, _FOOTER + 4, _A20, True),
+), _HEADER_CHROME + (
+    ('vline', _T1, _HEADER + 1, _FOOTER - _HEADER),
+    ('vline', _CENTER, _HEADER + 1, _HEIGHT - _HEADER - 1),
+    ('hline', 0, _FOOTER, _WIDTH),
+))
+
+SPLITS = ('splits', _HEADER_FIELDS + (
+    ('split', _Q1 + 8, _BODY, _A25, True),
+    ('split_500', 26, _FOOTER + 6, _A15, False),
+    ('split_avg', _CENTER + 28, _FOOTER + 6, _A15, False),
+), _HEADER_CHROME + (
+    ('hline', 0, _FOOTER, _WIDTH),
+    ('vline', _CENTER, _FOOTER + 1, _HEIGHT - _FOOTER - 1),
+    ('text', 2, _FOOTER + 8, _A10, "500"),
+    ('text', _CENTER + 3, _FOOTER + 8, _A10, "AVG"),
+))
+
+_ROW = const(13)  # Stats row pitch
+STATS = ('stats', _HEADER_FIELDS + (
+    ('distance', _T1 + 4, _HEADER + 2, _A12, True),
+    ('split_avg', _T1 + 4, _HEADER + 2 + _ROW, _A12, False),
+    ('chrono', _T1 + 4, _HEADER + 2 + 2 * _ROW, _A12, True),
+    ('stroke', _T1 + 4, _HEADER + 2 + 3 * _ROW, _A12, True),
+), _HEADER_CHROME + (
+    ('vline', _T1, _HEADER + 1, _HEIGHT - _HEADER - 1),
+    ('text', 2, _HEADER + 2, _A12, "DIST"),
+    ('text', 2, _HEADER + 2 + _ROW, _A12, "AVG"),
+    ('text', 2, _HEADER + 2 + 2 * _ROW, _A12, "TIME"),
+    ('text', 2, _HEADER + 2 + 3 * _ROW, _A12, "RATE"),
+))
+
+_MID = const(38)  # Trend chart divider
+TREND = ('trend', _HEADER_FIELDS, _HEADER_CHROME + (
+    ('hline', 0, _MID, _WIDTH),
+), (
+    ('speed_hist', 0, _HEADER + 2, _WIDTH - 1, _MID - 2, 2.0, 6.0),  # m/s
+    ('stroke_hist', 0, _MID + 2, _WIDTH - 1, _HEIGHT - 1, 10, 40),  # spm
+))
+
+LAYOUTS = (RACE, SPLITS, STATS, TREND)
+
+
+def build_screen(layout, fonts: FontRegistry):
+    """
+    Build screen. Text fonts are not loaded until the screen is shown.
+
+    :param layout: (name, fields, chrome[, charts])
+    :return: `Screen`, and text elements with their fonts ((name, size))
+    """
+    name, fields, chrome = layout[:3]
+    s = Screen(name, chrome, fonts)
+    texts = []
+    for f, x, y, font, diff in fields:
+        texts.append((s.add(TextBox(x, y, None, diff=diff), f), font))
+    for c, x0, y0, x1, y1, lo, hi in (layout[3] if len(layout) > 3 else ()):
+        s.add(Chart((x0, y0), (x1, y1), lo, hi), c)
+    return s, texts
+
+
+class Field:
+    """ Named field refreshed periodically from a data source. """
+
+    def __init__(self, name, period, source: callable, always=False):
+        """
+        :param name: Field (element) name, on any screen
+        :param period: Refresh period (ms)
+        :param source: Function returning value for element's `set` (text, or chart sample)
+        :param always: Refresh elements on all screens, not only the active one (e.g. chart history)
+        """
+        self.name = name
+        self.period = period
+        self.source = source
+        self.always = always
+        self.due = None  # Next refresh time (monotonic ms), None if never refreshed
+
+
 class RowUI:
-    def __init__(self, dh: DisplayHandler, setup=True):
+    def __init__(self, dh: DisplayHandler, setup=True, layouts=LAYOUTS, fonts=_fonts):
+        """
+        :param fonts: `FontRegistry` fonts are loaded from
+        """
         self._d = dh
+        self._layouts = layouts
+        self.fonts = fonts
+        self._fields = []  # Bound `Field`s
+        self.screens = []
+        self._texts = []  # Per screen, text elements with their fonts
 
         if setup: self._setup()
 
     def _setup(self):
-        # Header:
-        self.time = self._d.add(TextBox(0, 0, arial10))
-        self.batv = self._d.add(TextBox(42, 0, arial10))
-        self.gps = self._d.add(TextBox(108, 0, arial10))
-        ## Y Divider:
-        self._d.draw_fill_box((0, _HEADER), (_WIDTH - 1, _HEADER), col=1)
-
-        # Main Body:
-        body_large_y = 16
-        self.stroke = self._d.add(TextBox(9, body_large_y, arial25))
-        self.speed = self._d.add(TextBox(_CENTER + 10, body_large_y, arial25))
-        #self.cell_signal = self._d.add(Bar(Bar.VERT_B, (_T1+1, _HEADER+1), (_CENTER-1, _FOOTER-1)))
-        ## X Divider:
-        x = _T1; self._d.draw_fill_box((x, _HEADER + 1), (x, _FOOTER), col=1)
-        x = _CENTER; self._d.draw_fill_box((x, _HEADER + 1), (x, _HEIGHT - 1), col=1)
-
-        # Footer:
-        footer_y = _FOOTER + 4
-        self.chrono = self._d.add(TextBox(2, footer_y + 2, arial12))
-        self.distance = self._d.add(TextBox(_CENTER + 8, footer_y, arial20))
-        ## Y Divider:
-        self._d.draw_fill_box((0, _FOOTER), (_WIDTH - 1, _FOOTER), col=1)
+        for l in self._layouts:
+            s, texts = build_screen(l, self.fonts)
+            self.screens.append(s)
+            self._texts.append(texts)
+        self.show(0)
+
+    # Screens:
+    @property
+    def screen(self) -> Screen:
+        return self._d.screen
+
+    def show(self, i):
+        """
+        Switch to screen (by index). Its fields are refreshed straight away. Only fonts of the
+        screen's text stay loaded.
+        """
+        # Release fonts of other screens, then load this screen's:
+        for j, texts in enumerate(self._texts):
+            if j != i:
+                for el, _ in texts:
+                    el.set_font(None)
+        keep = set()
+        for el, (name, size) in self._texts[i]:
+            el.set_font(self.fonts.get(name, size))
+            keep.add(self.fonts.key(name, size))
+
+        self._d.show_screen(self.screens[i])  # Chrome fonts are only needed once
+        self.fonts.retain(keep)
+
+        for f in self._fields:
+            if not f.always:  # Fields updated on every screen (e.g. charts) keep to their period
+                f.due = None
+
+    def next_screen(self):
+        self.show((self.screens.index(self.screen) + 1) % len(self.screens))
+
+    # Refresh scheduling:
+    def bind(self, name, period, source: callable, always=False) -> Field:
+        """
+        Refresh field every `period` ms with the value from `source`, while shown. See `Field`.
+        """
+        f = Field(name, period, source, always)
+        self._fields.append(f)
+        return f
+
+    def _elements(self, f):
+        if f.always:
+            return [e for e in (s.get(f.name) for s in self.screens) if e is not None]
+        e = self.screen.get(f.name)
+        return () if e is None else (e,)
+
+    def refresh(self, now=None):
+        """
+        Refresh fields of the active screen which are due. Elements only become dirty if their
+        text changed.
+
+        :param now: Monotonic time (ms), defaults to now
+        :return: Time until next field is due (ms)
+        """
+        if now is None: now = clock.now_ms()
+        wait = MAX_WAIT
+        for f in self._fields:
+            if f.due is None or now >= f.due:
+                els = self._elements(f)
+                if not els:
+                    continue  # Not shown
+                v = f.source()
+                for el in els:
+                    el.set(v)
+                # Keep to schedule, unless behind by over a period:
+                f.due = now + f.period if f.due is None or now - f.due >= f.period else f.due + f.period
+            if f.due - now < wait:
+                wait = f.due - now
+        return wait
 
     def update(self):
         self._d.update()
+
+    async def update_async(self):
+        await self._d.update_async()
@@ -1,8 +1,8 @@
-import utime
+from rowing.util.clock import clock
 
 
 def _curr_tick():
-    return utime.ticks_ms()
+    return clock.now_ms()
 
 
 class Chrono:
@@ -23,7 +23,7 @@ class Chrono:
 
         curr = _curr_tick()
         if self._t_last is not None:
-            self._t = self._t + utime.ticks_diff(curr, self._t_last)
+            self._t = self._t + (curr - self._t_last)
 
         if en:
             self._t_last = curr
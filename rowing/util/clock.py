@@ -0,0 +1,147 @@
+"""
+Shared timebase: a monotonic millisecond clock (unwrapped `utime.ticks_ms`), disciplined to GPS time.
+"""
+import _thread
+import machine as m
+import utime
+
+
+TZ_OFFSET = -4 * 3600  # s -- Local time offset from UTC (EDT)
+
+STEP_MS = 1000  # Error beyond which the clock is stepped instead of slewed (ms)
+PHASE_GAIN = 4  # Fraction (1/n) of phase error corrected per GPS sample
+SLEW_MS = 1000  # Time over which each phase correction is applied (ms), > STEP_MS / PHASE_GAIN
+DRIFT_GAIN = 4  # Fraction (1/n) of measured drift applied per drift estimate
+DRIFT_MIN_INTERVAL = 10000  # Shortest interval to estimate drift over (ms)
+MAX_DRIFT = 500  # ppm
+
+
+def _rtc_epoch_ms():
+    """ Current RTC time in milliseconds since Jan 1, 2000 (RTC time zone, see `Clock.sync_rtc`). """
+    t = m.RTC().datetime()
+    sec = utime.mktime(t[0:3] + t[4:7] + (t[3],) + (None,))
+    return sec * 1000 + t[7] // 1000
+
+
+class Clock:
+    """
+    Monotonic clock disciplined to GPS time.
+
+    `now_ms()` is milliseconds since boot and never jumps. Epoch time is extrapolated from the
+    last GPS discipline point, corrected for the measured drift of the local oscillator. All
+    arithmetic is integer, so epoch times keep full precision.
+
+    Phase errors are slewed out (by running epoch time up to 25% fast or slow for a while), so
+    epoch time never goes backwards, except when stepped: on the first GPS sample, or on an
+    error of over `STEP_MS`. The discipline state is replaced as a whole (a single tuple), so
+    epoch time may be read from any thread while GPS samples are applied.
+    """
+
+    def __init__(self, tz=TZ_OFFSET):
+        """
+        :param tz: Local time offset from UTC (s)
+        """
+        self.tz = tz
+        self.synced = False  # Has been disciplined by GPS?
+
+        self._lock = _thread.allocate_lock()
+        self._tick_last = utime.ticks_ms()
+        self._mono = 0  # Unwrapped ms since creation
+
+        # Discipline state, (ref_mono, ref_epoch, drift, slew):
+        # epoch_ms = ref_epoch + dt + dt * drift / 10^6 + min(dt, SLEW_MS) * slew / SLEW_MS,
+        # where dt = mono - ref_mono, drift is in ppm (local clock slow -> positive), and slew is
+        # the phase correction (ms) applied over SLEW_MS from the discipline point.
+        self._ref = (0, _rtc_epoch_ms() - tz * 1000, 0, 0)  # RTC is kept in local time
+
+        self._gps_last = None  # Last GPS second used
+        self._sample_mono = None  # Monotonic time of last drift sample
+        self._sample_gps = None  # GPS time of last drift sample (ms)
+
+    @property
+    def drift(self):
+        """
+        :return: Estimated local clock drift (ppm)
+        """
+        return self._ref[2]
+
+    def now_ms(self):
+        """
+        :return: Monotonic time since boot (ms)
+        """
+        with self._lock:
+            t = utime.ticks_ms()
+            self._mono += utime.ticks_diff(t, self._tick_last)
+            self._tick_last = t
+            return self._mono
+
+    def epoch_ms(self, mono=None):
+        """
+        :param mono: Monotonic time (from `now_ms`), defaults to now
+        :return: Milliseconds since Jan 1, 2000 (UTC)
+        """
+        if mono is None: mono = self.now_ms()
+        ref_mono, ref_epoch, drift, slew = self._ref  # Consistent state, even if being replaced
+        dt = mono - ref_mono
+        return ref_epoch + dt + dt * drift // 1000000 + min(dt, SLEW_MS) * slew // SLEW_MS
+
+    def epoch_us(self, mono=None):
+        """
+        :param mono: Monotonic time (from `now_ms`), defaults to now
+        :return: Microseconds since Jan 1, 2000 (UTC)
+        """
+        return self.epoch_ms(mono) * 1000
+
+    def localtime(self):
+        """
+        :return: Local time tuple, as `utime.localtime`
+        """
+        return utime.localtime(self.epoch_ms() // 1000 + self.tz)
+
+    def gps_sync(self, t):
+        """
+        Discipline clock with a GPS timestamp. Should be called as soon as a sentence is read.
+
+        :param t: GPS `timestamp_utc` (`struct_time`)
+        :return: If the sample was used
+        """
+        if t is None or t.tm_year < 2000:
+            return False  # No date yet
+        gps_s = utime.mktime((t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec, 0, 0))
+        if gps_s == self._gps_last:
+            return False  # Only the first sentence of each second marks the second
+        self._gps_last = gps_s
+
+        mono = self.now_ms()
+        err = gps_s * 1000 - self.epoch_ms(mono)
+
+        if not self.synced or abs(err) > STEP_MS:  # Step
+            self._ref = (mono, gps_s * 1000, 0, 0)
+            self._sample_mono = mono
+            self._sample_gps = gps_s * 1000
+            if not self.synced:
+                self.synced = True
+                self.sync_rtc()
+            return True
+
+        # Estimate drift from GPS vs. local elapsed time:
+        drift = self._ref[2]
+        interval = mono - self._sample_mono
+        if interval >= DRIFT_MIN_INTERVAL:
+            measured = (gps_s * 1000 - self._sample_gps - interval) * 1000000 // interval
+            drift = max(-MAX_DRIFT, min(MAX_DRIFT, drift + (measured - drift) // DRIFT_GAIN))
+            self._sample_mono = mono
+            self._sample_gps = gps_s * 1000
+
+        # Slew phase, from current epoch time:
+        self._ref = (mono, self.epoch_ms(mono), drift, err // PHASE_GAIN)
+        return True
+
+    def sync_rtc(self):
+        """ Set the hardware RTC to local time (read back as such on the next boot). """
+        ms = self.epoch_ms()
+        t = utime.localtime(ms // 1000 + self.tz)
+        m.RTC().datetime((t[0], t[1], t[2], t[6], t[3], t[4], t[5], (ms % 1000) * 1000))
+
+
+clock = Clock()
@@ -1,15 +1,12 @@
-import machine as m
 import utime
 import json
 
-RTC = m.RTC()
+from rowing.util.clock import clock
 
 
 def _t_epoch():
     """ Get current time in microseconds since Jan 1, 2000. """
-    t = RTC.datetime()
-    sec = utime.mktime(t[0:3] + t[4:7] + (t[3],) + (None,))
-    return sec * (10 ** 6) + t[7]
+    return clock.epoch_us()
 
 
 class Log:
@@ -6,21 +6,26 @@ import machine as m
 
 from rowing.ui import RowUI
 from rowing.display import DisplayHandler
+from rowing.display.stats import RenderStats
+from rowing.display.font.registry import fonts
 from rowing.hardware import Hardware
 
 # Movement tracking:
 from rowing.loc_track import LocTracker
+from rowing.fusion import SpeedFusion
+from rowing.split import SplitTracker, format_split
+from rowing.simplify import TrackSimplifier
+from rowing.fix_gate import FixGate
 from rowing.stroke_track import StrokeTracker
 
 # Logging:
 from rowing.util.logging import Log, TransLog
 
-# Chrono:
+# Time:
 from rowing.util.chrono import Chrono
+from rowing.util.clock import clock
 
 
-RTC = m.RTC()
-
 VOLT_PERC = [(4.2, 100),
              (4.1, 90),
              (4.0, 80),
@@ -31,6 +36,9 @@ VOLT_PERC = [(4.2, 100),
              (3.5, 5),
              (3.0, 0)]
 
+TRACK_TOLERANCE = 2.0  # m -- Logged GPS track error (0 logs every fix)
+RENDER_STATS = False  # Record display render timings (logged with battery)
+
 _running = True
 # Async:
 _main_loop = asyncio.get_event_loop()
@@ -39,21 +47,22 @@ _acc_loop = asyncio.EventLoop(16, 16)
 # Log:
 _event_log = Log('/sd/event_log.txt')
 _trans_log = Log('/sd/trans_log.txt')
-# TODO: ADD RTC FOR LOGGING
 
 # Components:
 # #MAIN Hardware:
 _hw = Hardware()
 
-# Interface Locks:
-i2c_lock = _thread.allocate_lock()
+# Interface Locks (I2C is arbitrated by `_hw.i2c_bus`):
 sd_lock = _thread.allocate_lock()
 
 # #Middleware:
-_dh = DisplayHandler(_hw.oled, i2c_lock=i2c_lock)
+_dh = DisplayHandler(_hw.oled, stats=RenderStats(bus=_hw.oled_bus) if RENDER_STATS else None)
 _ui = RowUI(_dh, setup=False)
-_st = StrokeTracker(_hw.accel, TransLog('accel', log=_trans_log, log_tout=None), i2c_lock, sd_lock)
-_pt = LocTracker(_hw.gps, TransLog('gps', log=_trans_log), sd_lock, dist_enabler=_st.in_motion)
+_fs = SpeedFusion()
+_sp = SplitTracker()
+_st = StrokeTracker(_hw.accel, TransLog('accel', log=_trans_log, log_tout=None), None, sd_lock, fusion=_fs)
+_pt = LocTracker(_hw.gps, TransLog('gps', log=_trans_log), sd_lock, dist_enabler=_st.in_motion, fusion=_fs,
+                 split=_sp, simplify=TrackSimplifier(TRACK_TOLERANCE), gate=FixGate())
 
 # Timer:
 _chrono = Chrono(_st.in_motion)
@@ -64,9 +73,11 @@ def _setup():
     _hw.setup()
     _hw.run_splash()  # Hangs for duration
     _ui._setup()
+    _bind_ui()
     _event_log.open()
     _trans_log.open()
     _event_log.log({'state': "START"})
+    _event_log.log({'fonts': fonts.stats()})  # Load time and heap use of fonts shown
     _trans_log.log({'alert': "NEW_SESSION"})
 
 
@@ -85,6 +96,7 @@ def _close():
     _running = False
     _st.running = False
     _pt.running = False
+    _pt.close()
 
     _main_loop.stop()  # Ensure stopped
     _acc_loop.close()  # Forcefully close
@@ -142,71 +154,84 @@ async def _sleep_handler():
             if utime.ticks_diff(utime.ticks_ms(), p_start) > 2000:
                 print("==EXECUTING SLEEP==")
                 _exec_sleep()
+            else:  # Short press
+                _ui.next_screen()
         prev_p = curr_p
         await asyncio.sleep(0.1)
 
 
-_DISPLAY_HZ = 5
+# UI field sources:
+def _batt_text():
+    bv = _hw.battery.read_volt()
+    bp = None
+    for volt in VOLT_PERC:
+        if bv >= volt[0]:
+            bp = volt[1]
+            break
+    return "{:02}%".format(bp)
+    #return "{:04.2f}".format(bv)
+
+
+def _time_text():
+    t = clock.localtime()
+    return "{:02}:{:02}".format(t[3], t[4])
+
+
+def _gps_text():
+    return "GPS" if _hw.gps.has_fix else "XFX"
+
+
+def _speed_text():
+    if _hw.gps.has_fix and _hw.gps.speed_knots is not None:
+        # Fused (accelerometer rate) speed estimate:
+        return "{:.2f}".format(_fs.speed)
+    return " -.-- "  # No speed
+
+
+def _chrono_text():
+    ct_ms = _chrono.time
+    ct_hrs = int(ct_ms / (3600*1000))
+    ct_ms -= int((3600*1000) * ct_hrs)
+    ct_mins = int(ct_ms / (60*1000))
+    ct_ms -= (60*1000) * ct_mins
+    ct_sec = int(ct_ms/1000)
+    ct_ms -= ct_sec * 1000
+    return "{:01}:{:02}:{:02}.{:01}".format(ct_hrs, ct_mins, ct_sec, ct_ms // 100)
+
+
+def _bind_ui():
+    """ Bind UI fields to their data sources, with refresh periods (ms) to suit how often each changes. """
+    _ui.bind('batv', 60000, _batt_text)
+    _ui.bind('time', 1000, _time_text)
+    _ui.bind('gps', 1000, _gps_text)
+    _ui.bind('speed', 200, _speed_text)
+    _ui.bind('distance', 500, lambda: "{:05}".format(int(_fs.dist)))
+
+    # Splits (/500m):
+    _ui.bind('split', 1000, lambda: format_split(_sp.current_split, tenths=False))
+    _ui.bind('split_500', 1000, lambda: format_split(_sp.last_split, tenths=False))
+    _ui.bind('split_avg', 1000, lambda: format_split(_sp.avg_split, tenths=False))
+
+    # Accelerometer:
+    _ui.bind('stroke', 500, lambda: "{:2d}".format(_st.stroke_rate))
+
+    _ui.bind('chrono', 200, _chrono_text)
+
+    # Trends (sampled while hidden too):
+    _ui.bind('speed_hist', 1000, lambda: _fs.speed if _hw.gps.has_fix else None, always=True)
+    _ui.bind('stroke_hist', 2000, lambda: _st.stroke_rate, always=True)
+    #_ui.bind('cell_signal', ...)
 
 
 async def _ui_update():
     while _running:
-        s = utime.ticks_ms()
-        # Battery:
-        bv = _hw.battery.read_volt()
-        bp = None
-        for volt in VOLT_PERC:
-            if bv >= volt[0]:
-                bp = volt[1]
-                break
-        _ui.batv.text = "{:02}%".format(bp)
-        #_ui.batv.text = "{:04.2f}".format(_hw.battery.read_volt())
-
-        # Time
-        t = RTC.datetime()
-        _ui.time.text = "{:02}:{:02}".format(t[4], t[5])
-
-        # GPS
-        # # Speed, Fix Indicator:
-        _ui.speed.text = " -.-- "  # Assume no speed
-        if _hw.gps.has_fix:
-            _ui.gps.text = "GPS"
-
-            sp = _hw.gps.speed_knots
-            if sp is not None:
-                # Convert to m/s:
-                sp *= 0.5144  # <- m/s = 1 kt
-                _ui.speed.text = "{:.2f}".format(float(sp))
-        else:
-            _ui.gps.text = "XFX"
-
-        # #  Distance:
-        _ui.distance.text = "{:05}".format(int(_pt.dist))
-
-        # Accelerometer:
-        _ui.stroke.text = "{:2d}".format(_st.stroke_rate)
-
-        ct_ms = _chrono.time
-        ct_hrs = int(ct_ms / (3600*1000))
-        ct_ms -= int((3600*1000) * ct_hrs)
-        ct_mins = int(ct_ms / (60*1000))
-        ct_ms -= (60*1000) * ct_mins
-        ct_sec = int(ct_ms/1000)
-        ct_ms -= ct_sec * 1000
-        _ui.chrono.text = "{:01}:{:02}:{:02}.{:01}".format(ct_hrs, ct_mins, ct_sec, round(ct_ms/100))
-
-        #_ui.cell_signal.level = random.random()
-        _ui.update()
-
-        elapsed_ms = utime.ticks_diff(utime.ticks_ms(), s)
-        sleep_s = 1. / _DISPLAY_HZ - elapsed_ms / 1000.
-        if sleep_s > 0:
-            #print("sleep: ", sleep_s)
-            pass
+        wait = _ui.refresh()  # Fields due
+        await _ui.update_async()  # Only sends if something changed
+
+        if wait > 0:
+            await asyncio.sleep(wait / 1000.)
         else:
-            print("Display delay stretching! ({}s)".format(-sleep_s))
-            sleep_s = 0.001
-        await asyncio.sleep(sleep_s)
+            await asyncio.sleep(0)
 
 
 # Async task creation:
@@ -217,10 +242,14 @@ def _create_pri_tasks(l):
             await asyncio.sleep(10)
     async def _battery_log():
         while _running:
-            with sd_lock: _trans_log.log({'volt': _hw.battery.read_volt()})
+            with sd_lock:
+                _trans_log.log({'volt': _hw.battery.read_volt()})
+                _trans_log.log({'i2c': _hw.i2c_bus.stats()})
+                if _dh.stats is not None:
+                    _dh.stats.dump(_trans_log)
             await asyncio.sleep(60)
 
-    l.create_task(_pt.run_async(250))
+    l.create_task(_pt.run_async())
     l.create_task(_ui_update())
     #l.create_task(_cell_status())
     l.create_task(_sleep_handler())
@@ -0,0 +1,242 @@
+"""
+Host side display emulator: runs the display stack (`DisplayHandler`, `RowUI`, `SSD1306` driver)
+on Linux, against an emulated SSD1306 panel.
+
+`install()` must be called before importing any `rowing` or `devices` module. It puts pure Python
+implementations of the MicroPython modules used by the display stack on the import path, and
+provides the packaged fonts: the `.mpy` fonts cannot be loaded on the host, so `.py` fonts (as
+generated by `font_to_py.py`) are used if given, otherwise synthetic fonts of the same heights.
+
+Needs numpy.
+"""
+import importlib.abc
+import importlib.util
+import os
+import re
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(_HERE, '..', '..')
+
+FONTS = ('arial10', 'arial12', 'arial15', 'arial20', 'arial25')  # Packaged fonts
+FONT_PACKAGE = 'rowing.display.font.packaged'
+
+
+def install(font_dir=None):
+    """
+    Set up imports of the display stack on the host.
+
+    :param font_dir: Directory of `.py` fonts to use in place of the packaged fonts
+    """
+    for p in (ROOT, os.path.join(_HERE, 'shims')):
+        if p not in sys.path:
+            sys.path.insert(0, p)
+
+    sys.meta_path[:] = [f for f in sys.meta_path if not isinstance(f, _FontFinder)]
+    sys.meta_path.insert(0, _FontFinder(font_dir))
+
+
+class _FontFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """
+    Imports the packaged fonts, on every import (fonts may be unloaded and imported again).
+    """
+
+    def __init__(self, font_dir):
+        self.font_dir = font_dir
+
+    def find_spec(self, fullname, path=None, target=None):
+        pkg, _, name = fullname.rpartition('.')
+        if pkg != FONT_PACKAGE or name not in FONTS:
+            return None
+        path = os.path.join(self.font_dir, name + '.py') if self.font_dir else None
+        if path and os.path.exists(path):
+            return importlib.util.spec_from_file_location(fullname, path)
+        return importlib.util.spec_from_loader(fullname, self)
+
+    def create_module(self, spec):
+        name = spec.name.rpartition('.')[2]
+        return SynthFont(int(re.search(r'\d+', name).group()))
+
+    def exec_module(self, module):
+        pass
+
+
+class SynthFont:
+    """
+    Stand in for a `font_to_py` font module (horizontally mapped), of roughly proportional glyph
+    widths. Each glyph is a box with its character code marked across the middle row.
+    """
+
+    def __init__(self, height):
+        self._height = height
+        self._glyphs = {}
+
+    def height(self):
+        return self._height
+
+    def max_width(self):
+        return self._height // 2 + 1
+
+    def hmap(self):
+        return True
+
+    def reverse(self):
+        return False
+
+    def monospaced(self):
+        return False
+
+    def _width(self, ch):
+        if ch in ':.,\'':
+            return self._height // 5 + 1
+        if ch == ' ':
+            return self._height // 3
+        return self._height // 2 + 1
+
+    def get_ch(self, ch):
+        g = self._glyphs.get(ch)
+        if g is None:
+            h, w = self._height, self._width(ch)
+            px = np.zeros((h, w), dtype=bool)
+            if ch != ' ':
+                px[1, :-1] = px[-2, :-1] = True
+                px[1:-1, 0] = px[1:-1, -2] = True
+                code = ord(ch)
+                for i in range(1, w - 2):
+                    px[h // 2, i] = (code >> (i - 1)) & 1
+            g = self._glyphs[ch] = (memoryview(np.packbits(px, axis=1).tobytes()), h, w)
+        return g
+
+
+class Panel:
+    """
+    Emulated SSD1306 on an I2C bus (implements the `machine.I2C` methods used by `SSD1306_I2C`).
+
+    Command and data transactions are decoded into display RAM, kept as a NumPy array of page
+    bytes. Transfer statistics are kept for benchmarking.
+    """
+
+    ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8d: 1, 0xa8: 1, 0xd3: 1, 0xd5: 1, 0xd9: 1,
+            0xda: 1, 0xdb: 1}  # Command -> argument bytes
+
+    def __init__(self, width=128, height=64):
+        self.width = width
+        self.pages = height // 8
+        self.ram = np.zeros((self.pages, width), dtype=np.uint8)
+        self.on = False
+        self.inverted = False
+
+        self._cmd = []  # Command being received (with arguments)
+        self._cols = (0, width - 1)
+        self._page_range = (0, self.pages - 1)
+        self._col = 0
+        self._page = 0
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.transactions = 0
+        self.data_bytes = 0  # Display RAM bytes written
+        self.wire_bytes = 0  # All bytes on the bus (address, control, commands, data)
+
+    def bus_us(self, freq=400000):
+        """
+        :return: Bus time of transfers since statistics reset, at frequency (us)
+        """
+        return self.wire_bytes * 9 * 1000000 // freq  # 8 bits and acknowledge per byte
+
+    # `machine.I2C` interface:
+    def writeto(self, addr, buf, stop=True):
+        buf = bytes(buf)
+        self.transactions += 1
+        self.wire_bytes += 1 + len(buf)
+        ctrl = buf[0]
+        if ctrl == 0x40:  # Data
+            self._data(buf[1:])
+        elif ctrl == 0x80:  # Single command byte
+            self._command(buf[1])
+        elif ctrl == 0x00:  # Command stream
+            for b in buf[1:]:
+                self._command(b)
+        else:
+            raise ValueError("Unknown control byte: 0x{:02x}".format(ctrl))
+        return len(buf)
+
+    def _command(self, b):
+        cmd = self._cmd
+        cmd.append(b)
+        if len(cmd) <= self.ARGS.get(cmd[0], 0):
+            return  # Awaiting arguments
+        self._cmd = []
+
+        op = cmd[0]
+        if op == 0x21:
+            self._cols = (cmd[1], cmd[2])
+            self._col = cmd[1]
+        elif op == 0x22:
+            self._page_range = (cmd[1] & 0x07, cmd[2] & 0x07)
+            self._page = cmd[1] & 0x07
+        elif op & 0xfe == 0xae:
+            self.on = bool(op & 1)
+        elif op & 0xfe == 0xa6:
+            self.inverted = bool(op & 1)
+
+    def _data(self, data):
+        c0, c1 = self._cols
+        p0, p1 = self._page_range
+        for b in data:  # Horizontal addressing mode
+            self.ram[self._page, self._col] = b
+            self.data_bytes += 1
+            self._col += 1
+            if self._col > c1:
+                self._col = c0
+                self._page = p0 if self._page >= p1 else self._page + 1
+
+    # Output:
+    def image(self):
+        """
+        :return: Displayed pixels (height x width bool array)
+        """
+        bits = np.unpackbits(self.ram[:, np.newaxis, :], axis=1, bitorder='little')
+        img = bits.reshape(self.pages * 8, self.width).astype(bool)
+        if not self.on:
+            return np.zeros_like(img)
+        return ~img if self.inverted else img
+
+    def save_png(self, path, scale=4):
+        write_png(path, self.image(), scale)
+
+
+def frame_image(data, width=128, height=64):
+    """
+    :param data: MONO_VLSB frame bytes
+    :return: Frame pixels (height x width bool array)
+    """
+    pages = np.frombuffer(bytes(data), dtype=np.uint8).reshape(height // 8, width)
+    return np.unpackbits(pages[:, np.newaxis, :], axis=1, bitorder='little').reshape(height, width).astype(bool)
+
+
+def write_png(path, img, scale=4):
+    """
+    Write monochrome image as PNG (white on black, as the panel).
+
+    :param img: Pixels (2D bool array)
+    :param scale: Integer upscaling
+    """
+    px = np.repeat(np.repeat(img, scale, axis=0), scale, axis=1).astype(np.uint8) * 255
+    h, w = px.shape
+    raw = b''.join(b'\x00' + px[y].tobytes() for y in range(h))  # Filter type 0 per row
+
+    def chunk(kind, body):
+        return (struct.pack('>I', len(body)) + kind + body +
+                struct.pack('>I', zlib.crc32(kind + body) & 0xffffffff))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 0, 0, 0, 0)))  # 8 bit greyscale
+        f.write(chunk(b'IDAT', zlib.compress(raw)))
+        f.write(chunk(b'IEND', b''))
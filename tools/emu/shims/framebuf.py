@@ -0,0 +1,139 @@
+"""
+Pure Python implementation of the MicroPython `framebuf` module (monochrome formats only).
+"""
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+
+# 5x7 glyphs of characters 32-126, as columns (LSB at top), drawn in 8x8 cells. The layout
+# (8 pixels per character, transparent background) is as the built in font, the glyphs are not.
+_FONT = bytes.fromhex(
+    '0000000000' '00005f0000' '0007000700' '147f147f14' '242a7f2a12' '2313086462' '3649552250' '0005030000'
+    '001c224100' '0041221c00' '082a1c2a08' '08083e0808' '0050300000' '0808080808' '0060600000' '2010080402'
+    '3e5149453e' '00427f4000' '4261514946' '2141454b31' '1814127f10' '2745454539' '3c4a494930' '0171090503'
+    '3649494936' '064949291e' '0036360000' '0056360000' '0814224100' '1414141414' '0041221408' '0201510906'
+    '3249794136' '7e1111117e' '7f49494936' '3e41414122' '7f4141221c' '7f49494941' '7f09090101' '3e41415132'
+    '7f0808087f' '00417f4100' '2040413f01' '7f08142241' '7f40404040' '7f0204027f' '7f0408107f' '3e4141413e'
+    '7f09090906' '3e4151215e' '7f09192946' '4649494931' '01017f0101' '3f4040403f' '1f2040201f' '7f2018207f'
+    '6314081463' '0304780403' '6151494543' '00007f4141' '0204081020' '41417f0000' '0402010204' '4040404040'
+    '0001020400' '2054545478' '7f48444438' '3844444420' '384444487f' '3854545418' '087e090102' '081454543c'
+    '7f08040478' '00447d4000' '2040443d00' '007f102844' '00417f4000' '7c04180478' '7c08040478' '3844444438'
+    '7c14141408' '081414187c' '7c08040408' '4854545420' '043f444020' '3c4040207c' '1c2040201c' '3c4030403c'
+    '4428102844' '0c5050503c' '4464544c44' '0008364100' '00007f0000' '0041360800' '0804081008')
+
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, fmt=MONO_VLSB, stride=None):
+        if fmt not in (MONO_VLSB, MONO_HLSB, MONO_HMSB):
+            raise ValueError("Unsupported format: {}".format(fmt))
+        self.buf = buf
+        self.width = width
+        self.height = height
+        self.format = fmt
+        stride = width if stride is None else stride
+        if fmt != MONO_VLSB:
+            stride = (stride + 7) & ~7  # Rows are whole bytes
+        self.stride = stride
+
+    # Pixel access:
+    def _get(self, x, y):
+        if self.format == MONO_VLSB:
+            return (self.buf[(y >> 3) * self.stride + x] >> (y & 7)) & 1
+        b = self.buf[(x + y * self.stride) >> 3]
+        return (b >> (x & 7 if self.format == MONO_HMSB else 7 - (x & 7))) & 1
+
+    def _set(self, x, y, c):
+        if self.format == MONO_VLSB:
+            i = (y >> 3) * self.stride + x
+            mask = 1 << (y & 7)
+        else:
+            i = (x + y * self.stride) >> 3
+            mask = 1 << (x & 7 if self.format == MONO_HMSB else 7 - (x & 7))
+        if c:
+            self.buf[i] |= mask
+        else:
+            self.buf[i] &= ~mask & 0xFF
+
+    def _fill_area(self, x, y, w, h, c):
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        if self.format == MONO_VLSB:  # Byte at a time
+            for page in range(y0 >> 3, ((y1 - 1) >> 3) + 1):
+                top = max(y0 - (page << 3), 0)
+                bot = min(y1 - (page << 3), 8)
+                mask = (0xFF << top) & (0xFF >> (8 - bot))
+                base = page * self.stride
+                for i in range(base + x0, base + x1):
+                    if c:
+                        self.buf[i] |= mask
+                    else:
+                        self.buf[i] &= ~mask & 0xFF
+            return
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self._set(xx, yy, c)
+
+    # `framebuf.FrameBuffer` interface:
+    def fill(self, c):
+        v = 0xFF if c else 0
+        for i in range(len(self.buf)):
+            self.buf[i] = v
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        if c is None:
+            return self._get(x, y)
+        self._set(x, y, c)
+
+    def hline(self, x, y, w, c):
+        self._fill_area(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self._fill_area(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c):
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        self._fill_area(x, y, w, h, c)
+
+    def blit(self, fb, x, y, key=-1):
+        for sy in range(max(0, -y), min(fb.height, self.height - y)):
+            for sx in range(max(0, -x), min(fb.width, self.width - x)):
+                c = fb._get(sx, sy)
+                if c != key:
+                    self._set(x + sx, y + sy, c)
+
+    def scroll(self, dx, dy):
+        w, h = self.width, self.height
+        xs = range(w - 1, -1, -1) if dx > 0 else range(w)
+        ys = range(h - 1, -1, -1) if dy > 0 else range(h)
+        for y in ys:
+            if not 0 <= y - dy < h:
+                continue
+            for x in xs:
+                if 0 <= x - dx < w:
+                    self._set(x, y, self._get(x - dx, y - dy))
+
+    def text(self, s, x, y, c=1):
+        for ch in s:
+            o = ord(ch)
+            if 32 <= o <= 126:
+                i = (o - 32) * 5
+                for col in range(5):
+                    bits = _FONT[i + col]
+                    for row in range(8):
+                        if bits >> row & 1 and 0 <= x + col < self.width and 0 <= y + row < self.height:
+                            self._set(x + col, y + row, c)
+            x += 8
+
+
+def FrameBuffer1(buf, width, height, stride=None):
+    return FrameBuffer(buf, width, height, MONO_VLSB, stride)
@@ -0,0 +1,11 @@
+""" Host implementation of the parts of the MicroPython `machine` module used off device. """
+import time
+
+
+class RTC:
+    def datetime(self, t=None):
+        if t is not None:
+            return  # Host clock is not set
+        now = time.time()
+        g = time.gmtime(now)
+        return g.tm_year, g.tm_mon, g.tm_mday, g.tm_wday, g.tm_hour, g.tm_min, g.tm_sec, int(now % 1 * 1000000)
@@ -0,0 +1,12 @@
+""" Host implementation of the MicroPython `micropython` module. """
+
+
+def const(v):
+    return v
+
+
+def native(f):
+    return f
+
+
+viper = native
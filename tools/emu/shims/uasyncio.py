@@ -0,0 +1,2 @@
+""" Host stand in for `uasyncio`, using `asyncio`. """
+from asyncio import *  # noqa: F401,F403
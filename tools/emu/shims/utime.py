@@ -0,0 +1,46 @@
+""" Host implementation of the MicroPython `utime` module (epoch Jan 1, 2000). """
+import calendar
+import time as _time
+
+_EPOCH = calendar.timegm((2000, 1, 1, 0, 0, 0, 0, 0, 0))
+
+
+def ticks_ms():
+    return int(_time.perf_counter() * 1000)
+
+
+def ticks_us():
+    return int(_time.perf_counter() * 1000000)
+
+
+def ticks_diff(a, b):
+    return a - b
+
+
+def ticks_add(a, b):
+    return a + b
+
+
+def sleep(s):
+    _time.sleep(s)
+
+
+def sleep_ms(ms):
+    _time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    _time.sleep(us / 1000000)
+
+
+def time():
+    return int(_time.time()) - _EPOCH
+
+
+def mktime(t):
+    return calendar.timegm(tuple(t[:6]) + (0, 0, 0)) - _EPOCH
+
+
+def localtime(s=None):
+    t = _time.gmtime((time() if s is None else s) + _EPOCH)
+    return t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec, t.tm_wday, t.tm_yday
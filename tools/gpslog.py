@@ -0,0 +1,54 @@
+"""
+Host side helpers for reading GPS points back from a meter transducer log (`trans_log.txt`).
+"""
+import json
+import math
+import os
+import sys
+
+# Allow importing `rowing` modules from the repository root:
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+EARTH_RADIUS = 6.371 * 10 ** 6  # m
+KT_TO_MS = 0.5144  # <- m/s = 1 kt
+
+
+class LogPoint:
+    def __init__(self, ts, lat, lon, spd, simplified=False):
+        self.ts = ts  # Fix time (us since Jan 1, 2000)
+        self.lat = lat
+        self.lon = lon
+        self.spd = spd  # knots
+        self.simplified = simplified  # Logged by the track simplifier
+
+
+def read_points(path):
+    """
+    Read all GPS fixes from a log, in order.
+
+    :param path: Log file path
+    :return: List of `LogPoint`
+    """
+    points = []
+    with open(path) as f:
+        for line in f:
+            try:
+                d = json.loads(line)
+            except ValueError:
+                continue  # Partially written line
+            if not isinstance(d, dict) or d.get('atype') != 'gps' or 'lat' not in d:
+                continue
+            if 'pts' in d:  # Held back by simplifier, carries own fix time
+                points.append(LogPoint(d['pts'], d['lat'], d['lon'], d.get('spd'), simplified=True))
+            else:
+                points.append(LogPoint(d.get('ts'), d['lat'], d['lon'], d.get('spd')))
+    return points
+
+
+def point_m_dist(p1, p2):
+    """ Great circle distance between two points (m). """
+    d_lat = math.radians(p2.lat - p1.lat)
+    d_lon = math.radians(p2.lon - p1.lon)
+    a = (math.sin(d_lat / 2) ** 2 +
+         math.sin(d_lon / 2) ** 2 * math.cos(math.radians(p1.lat)) * math.cos(math.radians(p2.lat)))
+    return EARTH_RADIUS * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
@@ -0,0 +1,118 @@
+#! /usr/bin/python3
+"""
+Report how much `TrackSimplifier` compresses a full resolution GPS log.
+
+Sample usage:
+track_compress.py trans_log.txt -t 1 2 5
+track_compress.py --check  # Check error bound on synthetic tracks
+"""
+import argparse
+import math
+
+from gpslog import read_points, LogPoint, EARTH_RADIUS
+from rowing.simplify import TrackSimplifier
+
+
+def simplify(points, tolerance, window):
+    ts = TrackSimplifier(tolerance, window)
+    kept = []
+    for p in points:
+        out = ts.push(p)
+        if out is not None: kept.append(out)
+    out = ts.flush()
+    if out is not None and (not kept or kept[-1] is not out): kept.append(out)
+    return kept
+
+
+def _seg_dist(p, a, b):
+    """ Distance of `p` from segment a-b (m), using a local flat projection. """
+    cos_lat = math.cos(math.radians(a.lat))
+    px = math.radians(p.lon - a.lon) * cos_lat * EARTH_RADIUS
+    py = math.radians(p.lat - a.lat) * EARTH_RADIUS
+    bx = math.radians(b.lon - a.lon) * cos_lat * EARTH_RADIUS
+    by = math.radians(b.lat - a.lat) * EARTH_RADIUS
+    seg2 = bx * bx + by * by
+    u = 0 if seg2 == 0 else max(0., min(1., (px * bx + py * by) / seg2))
+    return math.hypot(px - u * bx, py - u * by)
+
+
+def max_error(points, kept):
+    """ Largest distance of a raw point from the simplified track (m). """
+    if len(kept) < 2:
+        return 0.
+    err = 0.
+    seg = 0
+    for p in points:
+        if p is kept[seg + 1] and seg + 2 < len(kept):
+            seg += 1
+        err = max(err, _seg_dist(p, kept[seg], kept[seg + 1]))
+    return err
+
+
+def synthetic_tracks(n=200):
+    """
+    :return: Named synthetic tracks (lists of points, 1 s apart) which are hard to simplify
+    """
+    lat0, lon0 = 42., -71.
+    deg = math.degrees(1 / EARTH_RADIUS)  # Per m of latitude
+    tracks = {
+        # Straight out and back, turning sharply:
+        'out_and_back': [(lat0 + deg * 4 * (i if i <= n // 2 else n - i), lon0) for i in range(n)],
+        # Zig-zag, legs of 5 points across a straight course:
+        'zig_zag': [(lat0 + deg * 4 * i, lon0 + deg * 6 * (i % 10 if i % 10 <= 5 else 10 - i % 10))
+                    for i in range(n)],
+    }
+    # Run, rest (drifting within 1.5 m), and run on at an angle:
+    tracks['stop_and_go'] = (
+        [(lat0 + deg * 4 * i, lon0) for i in range(50)] +
+        [(lat0 + deg * (196 + 1.5 * math.sin(i)), lon0 + deg * 1.5 * math.cos(2.3 * i)) for i in range(50)] +
+        [(lat0 + deg * (196 + 3 * i), lon0 + deg * 3 * i) for i in range(50)])
+    # Short out and back (11 fixes, turning 39 m out):
+    tracks['short_out_and_back'] = [(lat0 + 0.00007 * (i if i <= 5 else 10 - i), lon0) for i in range(11)]
+    return {k: [LogPoint(i * 10 ** 6, lat, lon, None) for i, (lat, lon) in enumerate(v)]
+            for k, v in tracks.items()}
+
+
+def check(tolerances, window):
+    """ Check error of simplified synthetic tracks is within tolerance. """
+    ok = True
+    for name, points in sorted(synthetic_tracks().items()):
+        for tol in tolerances:
+            kept = simplify(points, tol, window)
+            err = max_error(points, kept)
+            good = err <= tol + 1e-6
+            ok = ok and good
+            print("{:20} tol {:5.2f}m  kept {:4d}/{:4d}  max err {:6.2f}m  {}".format(
+                name, tol, len(kept), len(points), err, 'ok' if good else 'FAIL'))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log', nargs='?', help='Full resolution transducer log path')
+    parser.add_argument('-t', '--tolerance', type=float, nargs='+', default=[2.0],
+                        help='Simplification tolerances to report (m)')
+    parser.add_argument('-w', '--window', type=int, default=16,
+                        help='Simplifier window (points) default %(default)i')
+    parser.add_argument('--check', action='store_true',
+                        help='Check error bound on synthetic tracks, instead of reporting on a log')
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(0 if check(args.tolerance, args.window) else 1)
+    if args.log is None:
+        parser.error("log path is required")
+    points = read_points(args.log)
+    if not points:
+        print("No GPS points found in", args.log)
+        return
+    print("{} raw points".format(len(points)))
+    print("{:>8} {:>8} {:>8} {:>10}".format('tol (m)', 'kept', 'ratio', 'max err'))
+    for tol in args.tolerance:
+        kept = simplify(points, tol, args.window)
+        print("{:8.2f} {:8d} {:7.1f}x {:9.2f}m".format(
+            tol, len(kept), len(points) / len(kept), max_error(points, kept)))
+
+
+if __name__ == "__main__":
+    main()
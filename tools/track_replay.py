@@ -0,0 +1,76 @@
+#! /usr/bin/python3
+"""
+Replay a full resolution GPS log, and compare position and Doppler speed derived distances
+against a surveyed course length.
+
+Sample usage:
+track_replay.py trans_log.txt --course 2000
+"""
+import argparse
+
+from gpslog import read_points, point_m_dist, KT_TO_MS
+
+SPD_GAP = 5.0  # s -- Longest fix interval integrated over (as LocTracker)
+
+
+def pos_distance(points, min_interval=0.5):
+    """ Sum of distances between fixes at least `min_interval` (s) apart (m). """
+    dist = 0.
+    last = None
+    for p in points:
+        if last is None or (p.ts - last.ts) / 1e6 >= min_interval:
+            if last is not None:
+                dist += point_m_dist(last, p)
+            last = p
+    return dist
+
+
+def spd_distance(points):
+    """ Trapezoidal integral of Doppler speed over fix intervals (m). """
+    dist = 0.
+    last = None
+    for p in points:
+        if p.spd is None:
+            last = None
+            continue
+        if last is not None:
+            dt = (p.ts - last.ts) / 1e6
+            if 0 < dt <= SPD_GAP:
+                dist += (p.spd + last.spd) * KT_TO_MS * dt / 2
+        last = p
+    return dist
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log', help='Full resolution transducer log path')
+    parser.add_argument('-c', '--course', type=float, help='Surveyed course length (m)')
+    parser.add_argument('-b', '--blend', type=float, default=0.7,
+                        help='Weight of speed derived distance when blending default %(default).1f')
+    parser.add_argument('--first', type=int, default=0, help='First fix index of the piece')
+    parser.add_argument('--last', type=int, default=None, help='Last fix index of the piece')
+    args = parser.parse_args()
+
+    points = read_points(args.log)
+    if any(p.simplified for p in points):
+        print("WARNING: log was simplified, speed integration needs every fix (log with tolerance 0).")
+    last = args.last + 1 if args.last is not None else None
+    points = [p for p in points[args.first:last] if p.ts is not None]
+    if len(points) < 2:
+        print("Not enough GPS points found in", args.log)
+        return
+
+    d_pos = pos_distance(points)
+    d_spd = spd_distance(points)
+    d_blend = args.blend * d_spd + (1 - args.blend) * d_pos
+    print("{} fixes over {:.1f}s".format(len(points), (points[-1].ts - points[0].ts) / 1e6))
+    for name, d in (('position', d_pos), ('speed', d_spd), ('blend', d_blend)):
+        if args.course:
+            err = d - args.course
+            print("{:>9}: {:9.1f}m  error {:+7.1f}m ({:+.2f}%)".format(name, d, err, 100 * err / args.course))
+        else:
+            print("{:>9}: {:9.1f}m".format(name, d))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#! /usr/bin/python3
+# Needs numpy
+"""
+Render `RowUI` on the host display emulator with scripted rowing data, and report frame rate
+and display transfer volume of each display pipeline:
+
+* full -- every element redrawn and the whole frame sent each frame, the window set a command
+  per transaction (the original pipeline)
+* partial -- changed elements redrawn, changed page windows sent (`DisplayHandler.update`)
+* async -- as partial, sent a page at a time from a coroutine (`DisplayHandler.update_async`)
+
+Frame rates exclude time spent in the emulated panel; bus time is estimated from the bytes sent.
+
+Sample usage:
+ui_bench.py --frames 600 --png frames/ --png-every 50
+"""
+import argparse
+import asyncio
+import math
+import os
+import time
+
+import emu
+
+emu.install()
+
+from devices.ssd1306 import SSD1306_I2C  # noqa: E402
+from rowing.display import DisplayHandler  # noqa: E402
+from rowing.split import format_split  # noqa: E402
+from rowing.ui import RowUI  # noqa: E402
+
+PIPELINES = ('full', 'partial', 'async')
+
+STEP = 100  # ms -- Simulated time per frame
+
+
+class Row:
+    """ Scripted piece: speed oscillating through each stroke, at a steady rate. """
+
+    def __init__(self):
+        self.t = 0  # ms
+        self.dist = 0.
+        self.speed = 0.
+
+    def step(self, ms):
+        self.t += ms
+        rate = 24 + 4 * math.sin(self.t / 60000)  # spm
+        self.rate = int(rate)
+        self.speed = 4. + 0.6 * math.sin(2 * math.pi * rate * self.t / 60000)
+        self.dist += self.speed * ms / 1000
+
+    @property
+    def split(self):
+        return 500 / self.speed if self.speed > 0 else None
+
+    def chrono(self):
+        s, ms = divmod(self.t, 1000)
+        m, s = divmod(s, 60)
+        h, m = divmod(m, 60)
+        return "{:01}:{:02}:{:02}.{:01}".format(h, m, s, ms // 100)
+
+
+def bind(ui: RowUI, row: Row):
+    ui.bind('time', 1000, lambda: "12:00")
+    ui.bind('batv', 60000, lambda: "80%")
+    ui.bind('gps', 1000, lambda: "GPS")
+    ui.bind('speed', 200, lambda: "{:.2f}".format(row.speed))
+    ui.bind('distance', 500, lambda: "{:05}".format(int(row.dist)))
+    ui.bind('split', 1000, lambda: format_split(row.split, tenths=False))
+    ui.bind('split_500', 1000, lambda: format_split(row.split, tenths=False))
+    ui.bind('split_avg', 1000, lambda: format_split(row.split, tenths=False))
+    ui.bind('stroke', 500, lambda: "{:2d}".format(row.rate))
+    ui.bind('chrono', 200, row.chrono)
+
+
+def show_original(d):
+    """ Send whole frame as the original driver did: each window command its own transaction. """
+    for c in (0x21, 0, d.width - 1, 0x22, 0, d.pages - 1):  # Column, then page address range
+        d.write_cmd(c)
+    d.write_framebuf()
+
+
+def draw_all(dh):
+    """ Redraw every element, as the original `DisplayHandler.update` did. """
+    for e in dh.els:
+        e.mark_dirty()  # Also redraws every character of diff rendered text
+        e.draw(dh)
+    dh._clear_dirty()
+
+
+def run(pipeline, frames, switch=0, png_dir=None, png_every=0):
+    """
+    :param pipeline: One of `PIPELINES`
+    :param switch: Frames between screen switches (0 for none)
+    :return: Results `dict`
+    """
+    panel = emu.Panel()
+    dh = DisplayHandler(SSD1306_I2C(128, 64, panel))
+    ui = RowUI(dh)
+    row = Row()
+    bind(ui, row)
+    panel.reset_stats()
+
+    # Time spent in the emulated panel is excluded:
+    panel_s = [0.]
+    write = panel.writeto
+
+    def timed_write(addr, buf, stop=True):
+        ts = time.perf_counter()
+        try:
+            return write(addr, buf, stop)
+        finally:
+            panel_s[0] += time.perf_counter() - ts
+    panel.writeto = timed_write
+
+    async def frame_async():
+        await dh.update_async()
+
+    loop = asyncio.new_event_loop()
+    ts = time.perf_counter()
+    for i in range(frames):
+        row.step(STEP)
+        if switch and i and i % switch == 0:
+            ui.next_screen()
+        ui.refresh(row.t)
+
+        if pipeline == 'full':
+            draw_all(dh)
+            show_original(dh.d)
+        elif pipeline == 'partial':
+            dh.update()
+        else:
+            loop.run_until_complete(frame_async())
+
+        if png_dir and png_every and i % png_every == 0:
+            panel.save_png(os.path.join(png_dir, '{}_{:05}.png'.format(pipeline, i)))
+    elapsed = time.perf_counter() - ts - panel_s[0]
+    loop.close()
+
+    if not (panel.image() == emu.frame_image(dh.d.data)).all():
+        print("WARNING: {} pipeline left panel out of step with frame".format(pipeline))
+
+    return {'pipeline': pipeline, 'fps': frames / elapsed if elapsed > 0 else float('inf'),
+            'bytes_per_frame': panel.data_bytes / frames,
+            'transactions_per_frame': panel.transactions / frames,
+            'bus_ms_per_frame': panel.bus_us() / frames / 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--frames', type=int, default=300, help="Frames rendered per pipeline")
+    parser.add_argument('--pipeline', choices=PIPELINES + ('all',), default='all')
+    parser.add_argument('--switch', type=int, default=0, help="Frames between screen switches")
+    parser.add_argument('--png', help="Directory to write panel frames to")
+    parser.add_argument('--png-every', type=int, default=50, help="Frames between PNG frames")
+    args = parser.parse_args()
+
+    if args.png:
+        os.makedirs(args.png, exist_ok=True)
+    for p in (PIPELINES if args.pipeline == 'all' else (args.pipeline,)):
+        r = run(p, args.frames, args.switch, args.png, args.png_every)
+        print("{pipeline:8} {fps:8.1f} fps  {bytes_per_frame:7.1f} B/frame  "
+              "{transactions_per_frame:5.1f} transactions/frame  "
+              "{bus_ms_per_frame:6.2f} ms bus/frame (400 kHz)".format(**r))
+
+
+if __name__ == '__main__':
+    main()